@@ -0,0 +1,248 @@
+"""
+Benchmarks for the throughput of the environments, the reset latency and the cost of the observation transfer and the
+reward calculation. The results are written as JSON, so they can be compared between versions.
+
+Runs headless on Linux, the Qt platform defaults to "offscreen". Example:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --benchmarks step_throughput reset_latency --env-kwargs '{"soft_reset": true}'
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from importlib.metadata import version
+from typing import Callable, Dict, List
+
+# Must be set before Qt is loaded, the application processes inherit it
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np  # noqa: E402
+import PySide6  # noqa: E402
+
+from gym_gui_environments.pyside_gui_environments import (GUIEnv, GUIEnvRandomClick, GUIEnvRandomWidget,  # noqa: E402
+                                                          GUIVectorEnv)
+from gym_gui_environments.pyside_gui_environments.src.utils.frame_transport import OBSERVATION_TRANSPORTS  # noqa: E402
+
+ENV_CLASSES = {
+    "GUIEnv": GUIEnv,
+    "GUIEnvRandomClick": GUIEnvRandomClick,
+    "GUIEnvRandomWidget": GUIEnvRandomWidget
+}
+
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    values = np.array(values)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+
+    return {
+        "count": len(values),
+        "mean": float(values.mean()),
+        "p50": float(p50),
+        "p90": float(p90),
+        "p99": float(p99),
+        "max": float(values.max())
+    }
+
+
+def _get_action(env: GUIEnv):
+    if type(env) is GUIEnv:
+        # The only environment that needs an actual action, random coordinates as GUIEnvRandomClick uses them
+        return env.sample_random_coordinates()
+
+    return True
+
+
+def _run_steps(env: GUIEnv, steps: int) -> List[dict]:
+    infos = []
+    for _ in range(steps):
+        _, _, _, info = env.step(_get_action(env))
+        infos.append(info)
+    return infos
+
+
+def benchmark_step_throughput(args, env_kwargs: dict) -> dict:
+    results = {}
+
+    for name, env_class in ENV_CLASSES.items():
+        env = env_class(**env_kwargs)
+        env.seed(0)
+        env.reset()
+
+        # Warm-up, the first steps create the caches of the coverage measurement
+        _run_steps(env, args.warmup_steps)
+
+        start = time.perf_counter()
+        _run_steps(env, args.steps)
+        duration = time.perf_counter() - start
+
+        env.close()
+
+        results[name] = {"steps": args.steps, "seconds": duration, "steps_per_second": args.steps / duration}
+
+    return results
+
+
+def benchmark_reset_latency(args, env_kwargs: dict) -> dict:
+    env = GUIEnvRandomWidget(**{**env_kwargs, "soft_reset": True})
+    env.seed(0)
+
+    # Cold: a new application process is started, warm: the main window is replaced in the running process
+    latencies = {"cold": [], "warm": []}
+
+    for _ in range(args.resets):
+        for kind, hard_reset in [("cold", True), ("warm", False)]:
+            start = time.perf_counter()
+            env.reset(hard_reset=hard_reset)
+            latencies[kind].append(time.perf_counter() - start)
+
+            _run_steps(env, args.steps_between_resets)
+
+    env.close()
+
+    return {kind: _summarize(values) for kind, values in latencies.items()}
+
+
+def benchmark_observation_transfer(args, env_kwargs: dict) -> dict:
+    results = {}
+
+    for observation_transport in OBSERVATION_TRANSPORTS:
+        env = GUIEnvRandomWidget(**{**env_kwargs, "observation_transport": observation_transport,
+                                    "record_timings": True})
+        env.seed(0)
+        env.reset()
+
+        infos = _run_steps(env, args.steps)
+        env.close()
+
+        results[observation_transport] = {
+            phase: _summarize([info["timings"][phase] for info in infos])
+            for phase in ["encode_observation", "observation_transfer", "decode_observation"]
+        }
+
+    return results
+
+
+def benchmark_reward_cost(args, env_kwargs: dict) -> dict:
+    env = GUIEnvRandomWidget(**{**env_kwargs, "record_timings": True})
+    env.seed(0)
+    env.reset()
+
+    # The first step includes the coverage of the startup, the coverage percentage is the sum of the rewards
+    coverage = []
+    durations = []
+
+    coverage_percentage = 0.0
+    for _ in range(args.steps):
+        _, reward, _, info = env.step(True)
+        coverage_percentage += reward
+
+        coverage.append(coverage_percentage)
+        durations.append(info["timings"]["coverage_increase"])
+
+    env.close()
+
+    # Cost of calculate_coverage_increase() for consecutive blocks of steps, i.e. as the coverage grows
+    results = []
+    for block in np.array_split(np.arange(args.steps), args.reward_cost_blocks):
+        results.append({
+            "first_step": int(block[0]),
+            "last_step": int(block[-1]),
+            "coverage_percentage": coverage[block[-1]],
+            "coverage_increase": _summarize([durations[i] for i in block])
+        })
+
+    return {"blocks": results}
+
+
+def benchmark_parallel_scaling(args, env_kwargs: dict) -> dict:
+    results = {}
+
+    num_envs = 1
+    while num_envs <= args.max_envs:
+        vector_env = GUIVectorEnv(num_envs, GUIEnvRandomWidget, windows_per_process=args.windows_per_process,
+                                  **env_kwargs)
+        vector_env.seed(0)
+        vector_env.reset()
+
+        for _ in range(args.warmup_steps):
+            vector_env.step()
+
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            vector_env.step()
+        duration = time.perf_counter() - start
+
+        vector_env.close()
+
+        results[num_envs] = {
+            "steps": args.steps,
+            "seconds": duration,
+            "steps_per_second": args.steps * num_envs / duration
+        }
+
+        num_envs *= 2
+
+    return results
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "step_throughput": benchmark_step_throughput,
+    "reset_latency": benchmark_reset_latency,
+    "observation_transfer": benchmark_observation_transfer,
+    "reward_cost": benchmark_reward_cost,
+    "parallel_scaling": benchmark_parallel_scaling
+}
+
+
+def get_metadata(args) -> dict:
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "version": version("gym_gui_environments"),
+        "python": platform.python_version(),
+        "pyside6": PySide6.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "qt_qpa_platform": os.environ["QT_QPA_PLATFORM"],
+        "arguments": vars(args)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the benchmarks of the GUI environments and writes the results "
+                                                 "as JSON")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="Benchmarks to run, all by default")
+    parser.add_argument("--output", type=str, default=None, help="JSON file for the results, printed if not set")
+    parser.add_argument("--env-kwargs", type=json.loads, default={},
+                        help="Keyword arguments for all environments as a JSON object")
+    parser.add_argument("--steps", type=int, default=200, help="Measured steps per environment")
+    parser.add_argument("--warmup-steps", type=int, default=20, help="Steps before the measurement starts")
+    parser.add_argument("--resets", type=int, default=5, help="Number of cold and warm resets")
+    parser.add_argument("--steps-between-resets", type=int, default=20, help="Steps between two resets")
+    parser.add_argument("--reward-cost-blocks", type=int, default=10,
+                        help="Number of blocks of steps for which the reward cost is summarized")
+    parser.add_argument("--max-envs", type=int, default=4,
+                        help="Largest number of parallel environments, starting at 1 and doubled each time")
+    parser.add_argument("--windows-per-process", type=int, default=1,
+                        help="Main windows per application process in the parallel scaling benchmark")
+    args = parser.parse_args()
+
+    results = {"metadata": get_metadata(args), "results": {}}
+
+    for name in args.benchmarks:
+        print(f"Running benchmark '{name}'", file=sys.stderr)
+        results["results"][name] = BENCHMARKS[name](args, args.env_kwargs)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
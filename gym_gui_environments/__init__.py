@@ -17,3 +17,8 @@ register(
     id="PySideGUIRandomWidget-v0",
     entry_point="gym_gui_environments.pyside_gui_environments:GUIEnvRandomWidget"
 )
+
+register(
+    id="PySideGUIGrid-v0",
+    entry_point="gym_gui_environments.pyside_gui_environments:GUIEnvGrid"
+)
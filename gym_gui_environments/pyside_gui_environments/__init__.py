@@ -1 +1,3 @@
-from gym_gui_environments.pyside_gui_environments.gui_env import GUIEnv, GUIEnvRandomClick, GUIEnvRandomWidget
+from gym_gui_environments.pyside_gui_environments.gui_env import (GUIEnv, GUIEnvGrid, GUIEnvRandomClick,
+                                                                  GUIEnvRandomWidget)
+from gym_gui_environments.pyside_gui_environments.gui_vector_env import GUIVectorEnv
@@ -1,21 +1,51 @@
+import asyncio
+import concurrent.futures
+import contextlib
 import importlib.resources
+import itertools
 import logging
 import multiprocessing as mp
 import os
 import sys
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
 from multiprocessing import Process, Pipe
 from multiprocessing.connection import Connection
-from typing import Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import gym
+from gym.utils import seeding
 import numpy as np
 from PySide6.QtCore import QThread, Signal, Slot, QTimer, Qt, QElapsedTimer
 from PySide6.QtWidgets import QApplication
-from coverage import Coverage
 
+from gym_gui_environments.pyside_gui_environments.src.utils.action_mask import (ACTION_MASK_TYPES, create_action_mask,
+                                                                               get_grid_cell_centers)
+from gym_gui_environments.pyside_gui_environments.src.utils.cell_table import CellTable
+from gym_gui_environments.pyside_gui_environments.src.utils.coverage_reward import (get_coverage_snapshot,
+                                                                                   restore_coverage_snapshot)
+from gym_gui_environments.pyside_gui_environments.src.utils.frame_transport import create_frame_transport
+from gym_gui_environments.pyside_gui_environments.src.utils.hit_map import HitMap
+from gym_gui_environments.pyside_gui_environments.src.utils.html_report import HtmlReportRequest, submit_html_report
+from gym_gui_environments.pyside_gui_environments.src.utils.observation_pipeline import ObservationPipeline
 from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
-from gym_gui_environments.pyside_gui_environments.src.utils.utils import take_screenshot
+from gym_gui_environments.pyside_gui_environments.src.utils.protocol import (NO_CLICK_RESULT, REQUEST_RESET,
+                                                                            REQUEST_STEP, REQUEST_TERMINATE,
+                                                                            RESPONSE_OBSERVATION, RESPONSE_STEP,
+                                                                            RESPONSE_TERMINATED, Action, Channel,
+                                                                            Click, Response)
+from gym_gui_environments.pyside_gui_environments.src.utils.settle_detector import SettleDetector
+from gym_gui_environments.pyside_gui_environments.src.utils.settle_timeout_model import (SettleTimeoutModel,
+                                                                                        add_settle_durations,
+                                                                                        load_settle_durations,
+                                                                                        save_settle_durations)
+from gym_gui_environments.pyside_gui_environments.src.utils.step_timings import (PhaseTimer, StepTimingStatistics,
+                                                                                 measure)
+from gym_gui_environments.pyside_gui_environments.src.utils.sys_monitoring_coverage import create_coverage_measurer
+from gym_gui_environments.pyside_gui_environments.src.utils.utils import belongs_to_window, take_screenshot
+from gym_gui_environments.pyside_gui_environments.src.utils.widget_renderer import WidgetRenderer
 from gym_gui_environments.pyside_gui_environments.window_configuration import WINDOW_SIZE
 
 
@@ -24,121 +54,618 @@ LAST_STEP_TIMEOUT_ADDITIONAL_DELAY = 300
 LAST_PAINT_EVENT_TIMEOUT = 100
 LAST_PAINT_EVENT_TIMEOUT_ADDITIONAL_DELAY = 300
 
+# Upper bounds for the event driven settle detection, these equal the longest waits of the fixed delays
+SETTLE_TIMEOUT = 2 * LAST_PAINT_EVENT_TIMEOUT
+SETTLE_TIMEOUT_ADDITIONAL_DELAY = 2 * LAST_PAINT_EVENT_TIMEOUT_ADDITIONAL_DELAY
+
+SETTLE_MODES = ["event", "fixed"]
+
+CAPTURE_MODES = ["grab", "render"]
+
+OBSERVATION_MODES = ["screenshot", "state"]
+
+LAUNCHERS = ["spawn", "forkserver"]
+FORKSERVER_PRELOAD_MODULE = "gym_gui_environments.pyside_gui_environments.src.utils.forkserver_preload"
+
+# Numbers the HTML report directories of an application process, its main windows and episodes can end in the same
+# second
+HTML_REPORT_NUMBERS = itertools.count()
+
+
+def _send_observation_response(channel: Channel, response_type: int, message: list,
+                               click_result: tuple = NO_CLICK_RESULT, extras: dict = None,
+                               action_mask: np.ndarray = None, hit_map: tuple = None, phase_timer: PhaseTimer = None):
+    # The action mask, the hit map and the timings of the step are sent together with the observation, if they are used
+    extras = {} if extras is None else extras
+
+    if action_mask is not None:
+        extras["action_mask"] = action_mask
+
+    if hit_map is not None:
+        extras["hit_map"] = hit_map
+
+    if phase_timer is not None:
+        extras["timings"] = phase_timer.pop()
+        # time.monotonic() uses the same clock in all processes, the receiver calculates the transfer time with it
+        extras["sent_at"] = time.monotonic()
+
+    channel.send_response(response_type, click_result, extras, message)
+
 
 class RegisterClickThread(QThread):
     position_signal = Signal(int, int)
     random_widget_signal = Signal()
     generate_html_report_signal = Signal()
-
-    def __init__(self, paint_event_filter: PaintEventFilter, window_id, click_connection_child: Connection,
-                 terminate_connection_child: Connection, screenshot_connection_child: Connection,
-                 generate_html_report: bool = False):
+    start_settle_detection_signal = Signal(int)
+    soft_reset_signal = Signal()
+    render_signal = Signal()
+    action_mask_signal = Signal()
+    hit_map_signal = Signal()
+    gui_state_signal = Signal()
+
+    def __init__(self, paint_event_filter: PaintEventFilter, settle_detector: SettleDetector, window_id,
+                 channel: Channel, frame_transport, generate_html_report: bool = False, settle_mode: str = "event",
+                 widget_renderer: WidgetRenderer = None, observation_pipeline: ObservationPipeline = None,
+                 intermediate_observations: bool = False, action_mask: bool = False,
+                 observation_mode: str = "screenshot", phase_timer: PhaseTimer = None,
+                 settle_timeout_model: SettleTimeoutModel = None, step_lock: threading.Lock = None,
+                 export_hit_map: bool = False):
         super().__init__()
         self.paint_event_filter = paint_event_filter
+        self.settle_detector = settle_detector
+        self.settle_mode = settle_mode
         self.window_id = window_id
 
-        self.click_connection_child = click_connection_child
-        self.terminate_connection_child = terminate_connection_child
-        self.screenshot_connection_child = screenshot_connection_child
+        # If set, the observations are rendered from the widget tree instead of grabbed from the screen
+        self.widget_renderer = widget_renderer
+
+        # Screenshots are converted into this buffer, it can be reused because the frame transport sends or copies the
+        # screenshot right away
+        self.screenshot_buffer = np.zeros((WINDOW_SIZE[1], WINDOW_SIZE[0], 3), dtype=np.uint8)
 
-        self.connections = [self.click_connection_child, self.terminate_connection_child,
-                            self.screenshot_connection_child]
+        self.observation_pipeline = observation_pipeline
+
+        # In the "state" mode, the observation is the state vector that the slot, which gui_state_signal is connected
+        # to, writes into gui_state
+        self.observation_mode = observation_mode
+        self.gui_state: np.ndarray = None
+
+        # If True, an observation is also taken after each click of a macro action except the last one
+        self.intermediate_observations = intermediate_observations
+
+        # If True, the action mask is sent together with each observation, it is set by the slot that action_mask_signal
+        # is connected to
+        self.send_action_mask = action_mask
+        self.action_mask: np.ndarray = None
+
+        # If True, the exported hit map is sent together with the observations after which it has been rebuilt, it is
+        # set by the slot that hit_map_signal is connected to (None if it has not changed)
+        self.send_hit_map = export_hit_map
+        self.hit_map: tuple = None
+
+        # If set, the durations of the phases of each step are recorded and sent together with the observation
+        self.phase_timer = phase_timer
+
+        # If set, the wait after a click uses the budget that this model has learned for the type of the click
+        self.settle_timeout_model = settle_timeout_model
+
+        # Set by the slot that generate_html_report_signal is connected to, the report is rendered by the environment
+        self.html_report_request: HtmlReportRequest = None
+
+        # Set by the slots that execute the clicks in the GUI thread, the click signals block until then
+        self.click_result: tuple = None
+
+        # Application end of the channel, all requests of the environment arrive on it
+        self.channel = channel
+
+        self.frame_transport = frame_transport
 
         self.generate_html_report = generate_html_report
 
+        # Shared by the click threads of all main windows in the application process, so the windows are stepped one
+        # after another and the paint events and the settle detection always belong to the window that is stepped
+        self.step_lock = step_lock if step_lock is not None else contextlib.nullcontext()
+
         self.last_step_timer = QElapsedTimer()
         self.last_step_timer.start()
 
         self.current_last_step_timeout = LAST_STEP_TIMEOUT_ADDITIONAL_DELAY
 
+    def _get_settle_budget(self) -> Optional[int]:
+        if self.settle_timeout_model is None:
+            return None
+
+        return self.settle_timeout_model.get_budget()
+
+    def _wait_for_fixed_delay(self, increased_delay: bool):
+        settle_budget = self._get_settle_budget()
+
+        if settle_budget is not None:
+            self.current_last_step_timeout = settle_budget
+            last_paint_event_timeout = settle_budget
+        elif increased_delay:
+            self.current_last_step_timeout = LAST_STEP_TIMEOUT_ADDITIONAL_DELAY
+            last_paint_event_timeout = LAST_PAINT_EVENT_TIMEOUT_ADDITIONAL_DELAY
+        else:
+            self.current_last_step_timeout = LAST_STEP_TIMEOUT
+            last_paint_event_timeout = LAST_PAINT_EVENT_TIMEOUT
+
+        last_paint_event_timer = self.paint_event_filter.last_paint_event_timer
+
+        while not last_paint_event_timer.hasExpired(last_paint_event_timeout):
+            QThread.msleep(25)
+        QThread.msleep(last_paint_event_timeout)
+
+    def _wait_until_settled(self, increased_delay: bool):
+        settle_budget = self._get_settle_budget()
+
+        if settle_budget is not None:
+            # Same relation as between the fixed delays and the default settle timeouts
+            settle_timeout = 2 * settle_budget
+        else:
+            settle_timeout = SETTLE_TIMEOUT_ADDITIONAL_DELAY if increased_delay else SETTLE_TIMEOUT
+
+        # Clear before emitting, the detector sets the event again in the GUI thread when the GUI has settled
+        self.settle_detector.settled.clear()
+        self.start_settle_detection_signal.emit(settle_timeout)
+
+        if not self.settle_detector.wait(settle_timeout):
+            logging.debug("Clicking Thread: Settle detection did not finish in time, taking screenshot anyway")
+
+    def _take_screenshot(self) -> np.ndarray:
+        with measure(self.phase_timer, "take_screenshot"):
+            return self._capture_screenshot()
+
+    def _capture_screenshot(self) -> np.ndarray:
+        if self.widget_renderer is not None:
+            # Signal is connected to block until the GUI thread, where QWidget.render() has to be called, has rendered
+            # the frame
+            self.render_signal.emit()
+            return self.widget_renderer.frame
+
+        return take_screenshot(self.window_id, self.screenshot_buffer)
+
+    def _wait_for_gui(self, increased_delay: bool):
+        with measure(self.phase_timer, "settle_wait"):
+            if self.settle_mode == "event":
+                self._wait_until_settled(increased_delay)
+            else:
+                self._wait_for_fixed_delay(increased_delay)
+
+        if self.settle_timeout_model is not None:
+            # Records how long the last click caused painting
+            self.settle_timeout_model.finish()
+
+    def _take_observation(self, first_frame: bool = False) -> np.ndarray:
+        if self.observation_mode == "state":
+            with measure(self.phase_timer, "read_gui_state"):
+                # Signal is connected to block until the state has been read in the GUI thread
+                self.gui_state_signal.emit()
+            return self.gui_state
+
+        screenshot = self._take_screenshot()
+        if self.observation_pipeline is not None:
+            with measure(self.phase_timer, "preprocess_observation"):
+                screenshot = self.observation_pipeline.process(screenshot, first_frame)
+        return screenshot
+
+    def _send_observation(self, response_type: int, increased_delay: bool, first_frame: bool = False,
+                          click_result: tuple = NO_CLICK_RESULT, extras: dict = None):
+        self._wait_for_gui(increased_delay)
+        observation = self._take_observation(first_frame)
+
+        with measure(self.phase_timer, "encode_observation"):
+            message = self.frame_transport.encode(observation)
+
+        if self.send_action_mask:
+            # Signal is connected to block until the mask has been created in the GUI thread
+            self.action_mask_signal.emit()
+
+        if self.send_hit_map:
+            # Signal is connected to block until the hit map has been exported in the GUI thread
+            self.hit_map_signal.emit()
+
+        _send_observation_response(self.channel, response_type, message, click_result, extras, self.action_mask,
+                                   self.hit_map, self.phase_timer)
+
+        self.last_step_timer.restart()
+
+    def _execute_click(self, click: Click) -> Tuple[float, int, int, bool]:
+        # Signals are connected to block until the click has been executed in the GUI thread, the result contains the
+        # reward, the clicked coordinates and whether the GUI needs more time to settle
+        if isinstance(click, Tuple):
+            self.position_signal.emit(click[0], click[1])
+        else:
+            self.random_widget_signal.emit()
+
+        return self.click_result
+
+    def _execute_macro_action(self, clicks: List[Click]) -> Tuple[tuple, dict]:
+        click_results = []
+        intermediate_observations = []
+
+        for i, click in enumerate(clicks):
+            if i > 0:
+                # The next click has to see the GUI in the state the previous click left it in
+                increased_delay = click_results[-1][-1]
+                self._wait_for_gui(increased_delay)
+
+                if self.intermediate_observations:
+                    # Copied, because the screenshot buffer and the pipeline output are reused
+                    intermediate_observations.append(self._take_observation().copy())
+
+            click_results.append(self._execute_click(click))
+
+        # The response carries the result of the last click, the results of all clicks are sent as extras
+        extras = {"click_results": click_results}
+        if self.intermediate_observations:
+            extras["intermediate_observations"] = intermediate_observations
+
+        return click_results[-1], extras
+
+    def _step(self, action: Action):
+        if self.settle_mode == "fixed":
+            # In the event driven mode the GUI has already settled when the last screenshot was taken
+            with measure(self.phase_timer, "wait_last_step"):
+                while not self.last_step_timer.hasExpired(self.current_last_step_timeout):
+                    QThread.msleep(25)
+
+        if isinstance(action, list):
+            click_result, extras = self._execute_macro_action(action)
+        else:
+            click_result, extras = self._execute_click(action), None
+
+        # Click result and observation are sent in one response
+        self._send_observation(RESPONSE_STEP, click_result[-1], click_result=click_result, extras=extras)
+
+    def _terminate(self):
+        extras = {}
+        if self.settle_timeout_model is not None:
+            # The environment keeps the measurements of this process for the next application processes
+            extras["settle_durations"] = self.settle_timeout_model.pop_new_durations()
+            logging.debug(f"Clicking Thread: Settle budgets {self.settle_timeout_model.get_budgets()}")
+
+        if self.generate_html_report:
+            # Signal is connected to block here, until the covered lines have been copied for the report
+            self.generate_html_report_signal.emit()
+            extras["html_report_request"] = self.html_report_request
+
+        logging.debug("Clicking Thread: Stopping thread gracefully")
+        self.channel.send_response(RESPONSE_TERMINATED, extras=extras)
+
+    def _reset(self):
+        # Blocks until the main window has been replaced, which also sets the new window ID
+        self.soft_reset_signal.emit()
+
+        extras = None
+        if self.generate_html_report:
+            # Report of the finished episode, sent together with the initial observation of the new one
+            extras = {"html_report_request": self.html_report_request}
+
+        # Initial observation of the new episode, a new window needs to be painted completely
+        self._send_observation(RESPONSE_OBSERVATION, increased_delay=True, first_frame=True, extras=extras)
+
     def run(self) -> None:
         logging.debug("Clicking Thread: Starting thread")
+
+        if self.settle_mode == "event":
+            # Initial observation, the settle detection only starts once app.exec() runs and waits until the main
+            # window has been exposed and painted
+            with self.step_lock:
+                self._send_observation(RESPONSE_OBSERVATION, increased_delay=True, first_frame=True)
+
         while True:
-            for conn in mp.connection.wait(self.connections):
-                if conn == self.terminate_connection_child:
-                    assert conn.recv()
-                    if self.generate_html_report:
-                        # Signal is connected to block here, so the html report can be created fully and then the thread
-                        # continues
-                        self.generate_html_report_signal.emit()
-
-                    logging.debug("Clicking Thread: Stopping thread gracefully")
-                    self.terminate_connection_child.send(True)
+            try:
+                request_type, action = self.channel.receive_request()
+            except EOFError:
+                logging.debug("Clicking Thread: Pipe was destroyed, exiting!")
+                return
+
+            with self.step_lock:
+                if request_type == REQUEST_STEP:
+                    self._step(action)
+                elif request_type == REQUEST_RESET:
+                    self._reset()
+                elif request_type == REQUEST_TERMINATE:
+                    self._terminate()
                     return
-                elif conn == self.click_connection_child:
-                    while not self.last_step_timer.hasExpired(self.current_last_step_timeout):
-                        QThread.msleep(25)
 
-                    try:
-                        received_data = conn.recv()
-                    except EOFError:
-                        logging.debug("Clicking Thread: Pipe was destroyed, exiting!")
-                        return
 
-                    if isinstance(received_data, Tuple):
-                        self.position_signal.emit(received_data[0], received_data[1])
-                    else:
-                        self.random_widget_signal.emit()
-                elif conn == self.screenshot_connection_child:
-                    increased_delay = conn.recv()
+class ApplicationProcess:
+    """
+    Handle of a started application process, holds the process and, for each main window it hosts, the environment end
+    of the channel and the frame transport of the window.
+    """
 
-                    if increased_delay:
-                        self.current_last_step_timeout = LAST_STEP_TIMEOUT_ADDITIONAL_DELAY
-                        last_paint_event_timeout = LAST_PAINT_EVENT_TIMEOUT_ADDITIONAL_DELAY
-                    else:
-                        self.current_last_step_timeout = LAST_STEP_TIMEOUT
-                        last_paint_event_timeout = LAST_PAINT_EVENT_TIMEOUT
+    def __init__(self, process: Process, channels: List[Channel], frame_transports: list):
+        self.process = process
+        self.channels = channels
+        self.frame_transports = frame_transports
 
-                    last_paint_event_timer = self.paint_event_filter.last_paint_event_timer
+        # Number of windows whose environment has not been stopped yet
+        self.running_windows = len(channels)
 
-                    while not last_paint_event_timer.hasExpired(last_paint_event_timeout):
-                        QThread.msleep(25)
-                    QThread.msleep(last_paint_event_timeout)
+    def release_window(self):
+        # Called when the environment of a window has stopped it, the process is stopped with the last window
+        self.running_windows -= 1
 
-                    screenshot = take_screenshot(self.window_id)
-                    self.screenshot_connection_child.send(screenshot)
+        if self.running_windows == 0:
+            self.process.terminate()
+            self.process.join()
+            self.process.close()
 
-                    self.last_step_timer.restart()
+    def kill(self):
+        # Only for processes that have never been used, so no HTML report has to be generated
+        self.process.terminate()
+        self.process.join()
+        self.process.close()
+
+        for frame_transport in self.frame_transports:
+            frame_transport.close()
 
 
 class GUIEnv(gym.Env):
 
     def __init__(self, generate_html_report: bool = False, html_report_directory: str = None, log: bool = False,
-                 log_file_path: str = None):
+                 log_file_path: str = None, observation_transport: str = "pipe", copy_observations: bool = True,
+                 settle_mode: str = "event", use_sys_monitoring_coverage: bool = False, soft_reset: bool = False,
+                 hard_reset_interval: int = None, spare_application_processes: int = 0, launcher: str = "spawn",
+                 capture_mode: str = "grab", observation_pipeline: Dict = None,
+                 intermediate_observations: bool = False, use_hit_map: bool = False, export_hit_map: bool = False,
+                 action_mask: str = None,
+                 action_mask_grid_shape: Tuple[int, int] = (8, 8), observation_mode: str = "screenshot",
+                 record_timings: bool = False, timings_window: int = 1000, timings_file_path: str = None,
+                 adaptive_settle_timeouts: bool = False, settle_timeout_percentile: float = 95,
+                 settle_timeout_model_path: str = None):
         self.generate_html_report = generate_html_report
         self.html_report_directory = html_report_directory
         self.log = log
         self.log_file_path = log_file_path
 
-        self.click_connection_parent, self.click_connection_child = None, None
-        self.terminate_connection_parent, self.terminate_connection_child = None, None
-        self.screenshot_connection_parent, self.screenshot_connection_child = None, None
-
-        self.application_process: Process
+        # "pipe" sends the pickled screenshot, "shared_memory" writes it into a ring buffer and only sends the slot,
+        # "delta" sends only the tiles that have changed since the last screenshot
+        self.observation_transport = observation_transport
+        # Only relevant for "shared_memory" and "delta", if False the returned observations are views into the ring
+        # buffer respectively the reconstructed frame
+        self.copy_observations = copy_observations
+        self.frame_transport = None
+
+        # "event" takes the screenshot as soon as nothing is painted anymore, "fixed" waits for fixed delays after the
+        # last paint event
+        if settle_mode not in SETTLE_MODES:
+            raise ValueError(f"Unknown settle mode '{settle_mode}', choose from {SETTLE_MODES}")
+        self.settle_mode = settle_mode
+
+        # Collects the coverage with sys.monitoring instead of coverage.py, falls back to coverage.py before Python 3.12
+        self.use_sys_monitoring_coverage = use_sys_monitoring_coverage
+
+        # With soft resets, reset() replaces the main window in the running application process and restores the
+        # coverage to the state after startup, instead of starting a new application process. If hard_reset_interval
+        # is set, a new application process is started nonetheless every hard_reset_interval episodes.
+        self.soft_reset = soft_reset
+        self.hard_reset_interval = hard_reset_interval
+        self.episodes_in_application_process = 0
+
+        # Number of application processes that are started in advance, so a hard reset does not have to wait for the
+        # startup of a new one
+        self.number_of_spare_application_processes = spare_application_processes
+        self.spare_application_processes: List[ApplicationProcess] = []
+
+        # "spawn" starts every application process from scratch, "forkserver" forks them from a template process that
+        # has already imported PySide6 and the application and read the .ui files (only on Unix)
+        if launcher not in LAUNCHERS:
+            raise ValueError(f"Unknown launcher '{launcher}', choose from {LAUNCHERS}")
+        if launcher not in mp.get_all_start_methods():
+            raise ValueError(f"Launcher '{launcher}' is not supported on this platform")
+        self.launcher = launcher
+
+        # "grab" takes the observation from the screen with grabWindow(), "render" renders the widget tree into an
+        # image, which does not need a display
+        if capture_mode not in CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode '{capture_mode}', choose from {CAPTURE_MODES}")
+        self.capture_mode = capture_mode
+
+        # "screenshot" observes the window, "state" observes the logical state of the application as a vector (see
+        # STATE_FEATURES in gui_state.py), which is read from the widgets and backends without taking a screenshot
+        if observation_mode not in OBSERVATION_MODES:
+            raise ValueError(f"Unknown observation mode '{observation_mode}', choose from {OBSERVATION_MODES}")
+        if observation_mode == "state" and observation_pipeline is not None:
+            raise ValueError("The observation pipeline can only be used for screenshot observations")
+        if observation_mode == "state" and observation_transport == "delta":
+            raise ValueError("The delta observation transport can only be used for screenshot observations")
+        self.observation_mode = observation_mode
+
+        # Keyword arguments of ObservationPipeline (crop, resize, grayscale, dtype, frame_stack), the observations are
+        # then preprocessed in the application process before they are sent
+        screenshot_shape = (WINDOW_SIZE[1], WINDOW_SIZE[0], 3)
+        if observation_mode == "state":
+            # Imports the backends, which must not happen at the top of this module, because in the application
+            # process they have to be imported while the coverage is measured
+            from gym_gui_environments.pyside_gui_environments.src.utils.gui_state import get_gui_state_space
+
+            self.observation_pipeline = None
+            self.observation_space = get_gui_state_space()
+        elif observation_pipeline is not None:
+            self.observation_pipeline = ObservationPipeline(screenshot_shape, **observation_pipeline)
+            self.observation_space = self.observation_pipeline.observation_space
+        else:
+            self.observation_pipeline = None
+            self.observation_space = gym.spaces.Box(low=0, high=255, shape=screenshot_shape, dtype=np.uint8)
+
+        # For macro actions (a list of clicks), adds the observations after each but the last click to the info
+        self.intermediate_observations = intermediate_observations
+
+        # Looks up the clicked widgets in a cached map of the widget positions instead of with QApplication.widgetAt()
+        self.use_hit_map = use_hit_map or export_hit_map
+
+        # Adds the hit map (the widget ID of every pixel and the names of the widgets) to the info of each step. The
+        # application process only sends it again when it has been rebuilt. After reset(), the hit map of the initial
+        # observation is available as the exported_hit_map attribute.
+        self.export_hit_map = export_hit_map
+        self.exported_hit_map: Tuple[np.ndarray, List[str]] = None
+
+        # Adds the regions of the widgets that can currently be clicked meaningfully to the info of each step, as
+        # "boxes" (x, y, width, height of each widget), as a "grid" of action_mask_grid_shape cells or per "pixels". The
+        # mask of the initial observation is available as the action_mask attribute after reset().
+        if action_mask is not None and action_mask not in ACTION_MASK_TYPES:
+            raise ValueError(f"Unknown action mask type '{action_mask}', choose from {ACTION_MASK_TYPES}")
+        self.action_mask_type = action_mask
+        self.action_mask_grid_shape = action_mask_grid_shape
+        self.action_mask: np.ndarray = None
+
+        # Records the durations of the phases of each step in both processes and adds them to the info ("timings", in
+        # seconds). The timings of the last timings_window steps are summarized on close(), in timings_file_path as
+        # JSON (with histograms) or otherwise in the log.
+        self.record_timings = record_timings
+        self.timings_file_path = timings_file_path
+        self.phase_timer = PhaseTimer() if record_timings else None
+        self.timing_statistics = StepTimingStatistics(timings_window) if record_timings else None
+
+        # Replaces the two hard-coded wait budgets after a click by budgets that are learned per click type (class of
+        # the clicked widget and caused transition) from the measured paint durations. The measurements are kept across
+        # soft resets, and the application process sends them to the environment when it is stopped, which passes them
+        # on to the next application processes. With settle_timeout_model_path, they are also loaded from this file at
+        # the start and stored in it whenever an application process has been stopped, so later runs can use them.
+        self.adaptive_settle_timeouts = adaptive_settle_timeouts
+        self.settle_timeout_percentile = settle_timeout_percentile
+        self.settle_timeout_model_path = settle_timeout_model_path
+        self.settle_durations = {}
+        if adaptive_settle_timeouts and settle_timeout_model_path is not None:
+            self.settle_durations = load_settle_durations(settle_timeout_model_path)
+
+        # The HTML reports are rendered in background processes, these futures have the report directories as results
+        self.html_report_futures: List[Future] = []
+
+        # End of the channel to the application process in this process, i.e. the environment end in the environment
+        # process and the application end in the application process. Each step is one request and one response.
+        self.channel: Channel = None
+
+        # Set between step_async() respectively reset_async() and the matching step_wait() respectively reset_wait()
+        self.pending_action: Action = None
+        self.pending_reset = False
+        self.step_start_time: float = None
+
+        # Handle of the application process, which can be shared with the other environments of the window group
+        self.application_process: ApplicationProcess = None
+
+        # Environments whose main windows are hosted in the same application process (including this one), set by
+        # GUIVectorEnv with windows_per_process. The process is started by the first of them that is reset and sends
+        # the initial observations of all windows, so the first reset of the other ones only has to receive it.
+        self.window_group: List[GUIEnv] = None
+        self.initial_observation_pending = False
 
         self.random_state = np.random.RandomState()
+        # Seed of the random generator of gym.Env, which cannot be pickled, so the application process seeds its own
+        # generator with it
+        self.np_random_seed: int = None
 
-    def _initialize(self):
-        self.click_connection_parent, self.click_connection_child = Pipe(duplex=True)
-        self.terminate_connection_parent, self.terminate_connection_child = Pipe(duplex=True)
-        self.screenshot_connection_parent, self.screenshot_connection_child = Pipe(duplex=True)
+    def __getstate__(self):
+        # The environment is pickled when an application process is spawned. The handles of the other application
+        # processes (the active and the spare ones) are not needed there and can partly not be pickled at all.
+        state = self.__dict__.copy()
 
-        if self.generate_html_report:
-            logging.info("Enabled HTML report generation")
+        for key in ["channel", "application_process", "frame_transport", "window_group"]:
+            state[key] = None
+        state["spare_application_processes"] = []
+        state["html_report_futures"] = []
+
+        # Not needed there either, the bounds of a screenshot space are several megabytes, and Process.start() blocks
+        # until the new interpreter has read everything that does not fit into the pipe
+        state["observation_space"] = None
+
+        state["_np_random"] = None
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
 
-        ctx = mp.get_context("spawn")
-        self.application_process = ctx.Process(
+        if self.np_random_seed is not None:
+            self._np_random, _ = seeding.np_random(self.np_random_seed)
+
+    def _create_application_process(self, envs: List["GUIEnv"] = None) -> ApplicationProcess:
+        # Hosts a main window for each of the environments, by default only for this one
+        envs = [self] if envs is None else envs
+
+        connections_parent, connections_child = zip(*[Pipe(duplex=True) for _ in envs])
+
+        frame_transports = [
+            create_frame_transport(env.observation_transport, env.observation_space.shape, env.observation_space.dtype,
+                                   copy=env.copy_observations)
+            for env in envs
+        ]
+
+        ctx = mp.get_context(self.launcher)
+        if self.launcher == "forkserver":
+            # Only has an effect before the forkserver has been started, i.e. for the first application process
+            ctx.set_forkserver_preload([FORKSERVER_PRELOAD_MODULE])
+
+        process = ctx.Process(
             target=self._start_application,
-            args=(self.click_connection_child, self.terminate_connection_child, self.screenshot_connection_child,
-                  self.generate_html_report, self.log, self.log_file_path)
+            args=(envs, list(connections_child), frame_transports, self.log, self.log_file_path)
         )
 
-        self.application_process.start()
+        process.start()
+
+        return ApplicationProcess(process, [Channel(connection) for connection in connections_parent], frame_transports)
+
+    def _fill_spare_application_processes(self):
+        while len(self.spare_application_processes) < self.number_of_spare_application_processes:
+            self.spare_application_processes.append(self._create_application_process())
+
+    def _initialize(self):
+        if self.generate_html_report:
+            logging.info("Enabled HTML report generation")
+
+        if self.window_group is not None:
+            if any(env.channel is not None for env in self.window_group):
+                raise RuntimeError("The application process can only be started again after all environments of the "
+                                   "window group have been closed")
+
+            application_process = self._create_application_process(self.window_group)
+
+            for i, env in enumerate(self.window_group):
+                env._attach_application_process(application_process, i)
+                env.initial_observation_pending = env is not self
+
+            return
+
+        if self.spare_application_processes:
+            # Has already been started in advance, and most likely already sent its initial observation
+            application_process = self.spare_application_processes.pop(0)
+        else:
+            application_process = self._create_application_process()
+
+        self._attach_application_process(application_process, 0)
+
+        # Starts the replacements in the background
+        self._fill_spare_application_processes()
+
+    def _attach_application_process(self, application_process: ApplicationProcess, window: int):
+        self.application_process = application_process
+        self.channel = application_process.channels[window]
+        self.frame_transport = application_process.frame_transports[window]
 
     def _on_timeout(self):
         # Initial observation trigger
-        screenshot = take_screenshot(self.main_window.window().winId())
-        self.screenshot_connection_child.send(screenshot)
+        if self.observation_mode == "state":
+            from gym_gui_environments.pyside_gui_environments.src.utils.gui_state import get_gui_state
+
+            observation = get_gui_state(self.main_window)
+        elif self.widget_renderer is not None:
+            observation = self.widget_renderer.render()
+        else:
+            observation = take_screenshot(self.main_window.window().winId())
+        if self.observation_pipeline is not None:
+            observation = self.observation_pipeline.process(observation, first_frame=True)
+        # Already in the GUI thread, so the mask and the hit map are created directly instead of through the signals
+        if self.action_mask_type is not None:
+            self._create_action_mask()
+        if self.export_hit_map:
+            self._export_hit_map()
+        _send_observation_response(self.channel, RESPONSE_OBSERVATION, self.frame_transport.encode(observation),
+                                   action_mask=self.register_click_thread.action_mask,
+                                   hit_map=self.register_click_thread.hit_map, phase_timer=self.phase_timer)
 
     @staticmethod
     def initialize_logger():
@@ -151,9 +678,9 @@ class GUIEnv(gym.Env):
 
         return logger, formatter
 
-    def _start_application(self, click_connection_child: Connection, terminate_connection_child: Connection,
-                           screenshot_connection_child: Connection, generate_html_report: bool,
+    def _start_application(self, envs: List["GUIEnv"], connections_child: List[Connection], frame_transports: list,
                            log: bool, log_file_path: str):
+        # envs are the copies of the environments whose main windows are hosted in this process, self is one of them
         if log:
             logger, formatter = self.initialize_logger()
             logger.setLevel(logging.DEBUG)
@@ -167,132 +694,576 @@ class GUIEnv(gym.Env):
             coveragerc_file_path = resource.__str__()
 
         # data_suffix appends process id to the database file which is needed when this environment is run in parallel
-        coverage_measurer = Coverage(data_file=None, config_file=coveragerc_file_path)
-        coverage_measurer.start()
-        from gym_gui_environments.pyside_gui_environments.src.main_window import MainWindow
-        coverage_measurer.stop()
+        coverage_measurer = create_coverage_measurer(coveragerc_file_path, self.use_sys_monitoring_coverage)
+
+        forkserver_preload = sys.modules.get(FORKSERVER_PRELOAD_MODULE)
+        if forkserver_preload is not None:
+            # Forked from the forkserver, which has already imported the application
+            restore_coverage_snapshot(coverage_measurer, forkserver_preload.import_coverage_snapshot)
+        else:
+            coverage_measurer.start()
+            from gym_gui_environments.pyside_gui_environments.src.main_window import MainWindow  # noqa: F401
+            coverage_measurer.stop()
+
+        # Lines executed when importing the application, a soft reset restores the coverage to this state
+        coverage_snapshot = get_coverage_snapshot(coverage_measurer)
 
-        self.paint_event_filter = PaintEventFilter()
+        paint_event_filter = PaintEventFilter()
         app = QApplication()
-        app.installEventFilter(self.paint_event_filter)
+        app.installEventFilter(paint_event_filter)
+
+        # Only needed if the main windows share the application
+        step_lock = threading.Lock() if len(envs) > 1 else None
+
+        for i, (env, connection_child, frame_transport) in enumerate(zip(envs, connections_child, frame_transports)):
+            if i > 0:
+                # The import has only been measured once, every window has its own coverage measurer that starts with
+                # the coverage of the import
+                coverage_measurer = create_coverage_measurer(coveragerc_file_path)
+                restore_coverage_snapshot(coverage_measurer, coverage_snapshot)
+
+            env._start_window(connection_child, frame_transport, coveragerc_file_path, coverage_measurer,
+                              coverage_snapshot, paint_event_filter, step_lock)
+
+        app.exec()
+
+    def _start_window(self, connection_child: Connection, frame_transport, coveragerc_file_path: str,
+                      coverage_measurer, coverage_snapshot: Dict[str, List[int]], paint_event_filter: PaintEventFilter,
+                      step_lock: Optional[threading.Lock]):
+        from gym_gui_environments.pyside_gui_environments.src.main_window import MainWindow
+
+        # Created here, because the lock of the channel cannot be pickled
+        self.channel = Channel(connection_child)
+        self.frame_transport = frame_transport
+
+        self.coveragerc_file_path = coveragerc_file_path
+        self.coverage_measurer = coverage_measurer
+        self.coverage_snapshot = coverage_snapshot
+        self.paint_event_filter = paint_event_filter
+
+        app = QApplication.instance()
+
+        self.settle_detector = SettleDetector(self.paint_event_filter)
+
+        self.settle_timeout_model = None
+        if self.adaptive_settle_timeouts:
+            # Starts with the measurements of the previous application processes
+            self.settle_timeout_model = SettleTimeoutModel(self.paint_event_filter, self.settle_timeout_percentile,
+                                                           durations=self.settle_durations)
 
         self.main_window = MainWindow(coverage_measurer, self.paint_event_filter)
         self.main_window.show()
 
-        self.register_click_thread = RegisterClickThread(self.paint_event_filter, self.main_window.window().winId(),
-                                                         click_connection_child, terminate_connection_child,
-                                                         screenshot_connection_child, generate_html_report)
+        # Records the phases in this process, the timer of the environment process has only been copied
+        self.phase_timer = PhaseTimer() if self.record_timings else None
+        self.main_window.phase_timer = self.phase_timer
+        self.main_window.settle_timeout_model = self.settle_timeout_model
+
+        self.hit_map = None
+        if self.use_hit_map:
+            self.hit_map = HitMap(self.main_window)
+            app.installEventFilter(self.hit_map)
+            self.main_window.hit_map = self.hit_map
+
+        # Version of the hit map that has been sent last
+        self.exported_hit_map_version: int = None
+
+        self.widget_renderer = None
+        if self.capture_mode == "render":
+            self.widget_renderer = WidgetRenderer(self.main_window, self.paint_event_filter)
+
+        self.register_click_thread = RegisterClickThread(self.paint_event_filter, self.settle_detector,
+                                                         self.main_window.window().winId(), self.channel,
+                                                         self.frame_transport,
+                                                         self.generate_html_report, self.settle_mode,
+                                                         self.widget_renderer, self.observation_pipeline,
+                                                         self.intermediate_observations,
+                                                         self.action_mask_type is not None, self.observation_mode,
+                                                         self.phase_timer, self.settle_timeout_model, step_lock,
+                                                         self.export_hit_map)
 
         # Connect click thread signals to main window
         self.register_click_thread.position_signal.connect(self._simulate_click,
                                                            type=Qt.BlockingQueuedConnection)
         self.register_click_thread.random_widget_signal.connect(self._simulate_click_on_random_widget,
                                                                 type=Qt.BlockingQueuedConnection)
-        self.register_click_thread.generate_html_report_signal.connect(self._generate_html_report,
+        self.register_click_thread.generate_html_report_signal.connect(self._create_html_report_request,
                                                                        type=Qt.BlockingQueuedConnection)
+        self.register_click_thread.start_settle_detection_signal.connect(self.settle_detector.start,
+                                                                         type=Qt.QueuedConnection)
+        self.register_click_thread.soft_reset_signal.connect(self._soft_reset, type=Qt.BlockingQueuedConnection)
+        self.register_click_thread.action_mask_signal.connect(self._create_action_mask,
+                                                              type=Qt.BlockingQueuedConnection)
+        self.register_click_thread.hit_map_signal.connect(self._export_hit_map, type=Qt.BlockingQueuedConnection)
+        self.register_click_thread.gui_state_signal.connect(self._read_gui_state, type=Qt.BlockingQueuedConnection)
+        if self.widget_renderer is not None:
+            self.register_click_thread.render_signal.connect(self.widget_renderer.render,
+                                                             type=Qt.BlockingQueuedConnection)
 
         # Connect main window observation signals to this process
         self.register_click_thread.start()
 
-        # Send initial observation, but this has to happen after startup, i.e. after app.exec() runs
-        QTimer.singleShot(2000, self._on_timeout)
+        if self.settle_mode == "fixed":
+            # Send initial observation, but this has to happen after startup, i.e. after app.exec() runs
+            QTimer.singleShot(2000, self._on_timeout)
 
-        app.exec()
+    def _send_terminate(self):
+        logging.debug("Sending close indication to clicking thread")
+        self.channel.send_terminate()
+        self.pending_action = None
+        self.pending_reset = False
+
+    def _receive_termination(self) -> bool:
+        # Responses that have not been received yet (an initial observation or the result of a pending step) arrive
+        # before the confirmation, returns True once the confirmation has been received
+        response = self.channel.receive_response()
+        if response.response_type != RESPONSE_TERMINATED:
+            return False
+
+        html_report_request = response.extras.get("html_report_request")
+        if html_report_request is not None:
+            self._submit_html_report(html_report_request)
+
+        settle_durations = response.extras.get("settle_durations")
+        if settle_durations is not None:
+            add_settle_durations(self.settle_durations, settle_durations)
+
+            if self.settle_timeout_model_path is not None:
+                save_settle_durations(self.settle_timeout_model_path, self.settle_durations)
+
+        return True
+
+    def _join_application_process(self):
+        self.frame_transport.close()
+        self.channel = None
+
+        # Only stops the process if no other environment uses it anymore
+        self.application_process.release_window()
+        self.application_process = None
 
     def _stop_application_process(self):
-        logging.debug("Sending close indication to clicking thread")
-        self.terminate_connection_parent.send(True)
-        self.terminate_connection_parent.recv()
+        self._send_terminate()
+
+        while not self._receive_termination():
+            pass
 
-        self.application_process.terminate()
-        self.application_process.join()
-        self.application_process.close()
+        self._join_application_process()
+
+    async def _astop_application_process(self):
+        self._send_terminate()
+
+        while True:
+            await self._wait_for_response_async()
+            if self._receive_termination():
+                break
+
+        self._join_application_process()
 
     @Slot(int, int)
     def _simulate_click(self, pos_x: int, pos_y: int):
         reward, increased_delay = self.main_window.simulate_click(pos_x, pos_y)
-        self.click_connection_child.send((reward, increased_delay))
+        self.register_click_thread.click_result = (reward, pos_x, pos_y, increased_delay)
 
     @Slot()
     def _simulate_click_on_random_widget(self):
         reward, pos_x, pos_y, increased_delay = self.main_window.simulate_click_on_random_widget()
-        self.click_connection_child.send((reward, pos_x, pos_y, increased_delay))
+        self.register_click_thread.click_result = (reward, pos_x, pos_y, increased_delay)
 
     @Slot()
-    def _generate_html_report(self):
+    def _soft_reset(self):
+        from gym_gui_environments.pyside_gui_environments.src.main_window import MainWindow
+
+        if self.generate_html_report:
+            # One report per episode, as when the application process is restarted
+            self._create_html_report_request()
+
+        # Hide all windows first (main window, dialogs, open combo boxes), because deleteLater() only deletes them
+        # the next time the event loop runs and until then they would still count as active modal widgets. The windows
+        # of other main windows in the same application are left alone.
+        for widget in QApplication.topLevelWidgets():
+            if belongs_to_window(self.main_window, widget):
+                widget.hide()
+        self.main_window.deleteLater()
+
+        restore_coverage_snapshot(self.coverage_measurer, self.coverage_snapshot)
+
+        self.main_window = MainWindow(self.coverage_measurer, self.paint_event_filter)
+        self.main_window.show()
+        self.main_window.phase_timer = self.phase_timer
+        self.main_window.settle_timeout_model = self.settle_timeout_model
+
+        self.register_click_thread.window_id = self.main_window.window().winId()
+        if self.widget_renderer is not None:
+            self.widget_renderer.main_window = self.main_window
+        if self.hit_map is not None:
+            self.hit_map.main_window = self.main_window
+            self.hit_map.invalidate()
+            self.main_window.hit_map = self.hit_map
+
+    @Slot()
+    def _read_gui_state(self):
+        from gym_gui_environments.pyside_gui_environments.src.utils.gui_state import get_gui_state
+
+        self.register_click_thread.gui_state = get_gui_state(self.main_window, self.register_click_thread.gui_state)
+
+    @Slot()
+    def _create_action_mask(self):
+        boxes = self.main_window.get_clickable_boxes()
+        self.register_click_thread.action_mask = create_action_mask(boxes, self.action_mask_type, WINDOW_SIZE,
+                                                                    self.action_mask_grid_shape)
+
+    @Slot()
+    def _export_hit_map(self):
+        # Only exported if the map has been rebuilt since it has been sent last, e.g. after a dialog has been opened
+        self.hit_map.update()
+
+        if self.hit_map.version == self.exported_hit_map_version:
+            self.register_click_thread.hit_map = None
+        else:
+            self.register_click_thread.hit_map = self.hit_map.export()
+            self.exported_hit_map_version = self.hit_map.version
+
+    @Slot()
+    def _create_html_report_request(self):
         if self.html_report_directory is not None:
-            directory = self.html_report_directory
+            parent_directory = self.html_report_directory
         else:
-            clicker_type = self.get_clicker_type()
-            directory = os.path.join("coverage-reports", clicker_type, datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+            parent_directory = os.path.join("coverage-reports", self.get_clicker_type())
 
-        self.main_window.generate_html_report(directory=directory)
+        # The reports of consecutive episodes and of other application processes can be rendered into the same parent
+        # directory at the same time, so each gets its own directory, whose name also contains the process ID
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        directory = os.path.join(parent_directory, f"{timestamp}_{os.getpid()}-{next(HTML_REPORT_NUMBERS)}")
+
+        # Only the covered lines are copied here, rendering the report is left to the environment process
+        covered_lines = get_coverage_snapshot(self.coverage_measurer)
+        self.register_click_thread.html_report_request = (self.coveragerc_file_path, covered_lines, directory)
+
+    def _submit_html_report(self, html_report_request: HtmlReportRequest):
+        self.html_report_futures.append(submit_html_report(html_report_request))
+
+    def wait_for_html_reports(self, timeout: float = None) -> List[str]:
+        """
+        Waits until all HTML reports that have been requested so far are rendered and returns their directories. Raises
+        a TimeoutError if they are not finished after timeout seconds.
+        """
+        _, not_done = concurrent.futures.wait(self.html_report_futures, timeout)
+
+        if not_done:
+            raise TimeoutError(f"{len(not_done)} HTML reports are not finished after {timeout} seconds")
+
+        return [future.result() for future in self.html_report_futures]
 
     @staticmethod
     def get_clicker_type():
         return "gui-env"
 
+    def _receive_observation(self, response: Response) -> np.ndarray:
+        if self.action_mask_type is not None:
+            self.action_mask = response.extras["action_mask"]
+
+        if "hit_map" in response.extras:
+            # Otherwise it has not changed since the last observation
+            self.exported_hit_map = response.extras["hit_map"]
+
+        if self.record_timings:
+            self.phase_timer.timings.update(response.extras["timings"])
+            self.phase_timer.add("observation_transfer", time.monotonic() - response.extras["sent_at"])
+
+        html_report_request = response.extras.get("html_report_request")
+        if html_report_request is not None:
+            # Report of the episode that was ended by a soft reset
+            self._submit_html_report(html_report_request)
+
+        with measure(self.phase_timer, "decode_observation"):
+            return self.frame_transport.decode(response.payload)
+
+    def _receive_initial_observation(self) -> np.ndarray:
+        response = self.channel.receive_response()
+        assert response.response_type == RESPONSE_OBSERVATION
+
+        return self._receive_observation(response)
+
+    def _get_observation_info(self) -> dict:
+        # Entries of the step info that belong to the last received observation
+        info = {}
+
+        if self.action_mask_type is not None:
+            info["action_mask"] = self.action_mask
+
+        if self.export_hit_map:
+            info["hit_map"] = self.exported_hit_map
+
+        if self.record_timings:
+            timings = self.phase_timer.pop()
+            self.timing_statistics.add(timings)
+            info["timings"] = timings
+
+        return info
+
     def sample_random_coordinates(self) -> Tuple[int, int]:
         x = self.random_state.randint(0, WINDOW_SIZE[0])
         y = self.random_state.randint(0, WINDOW_SIZE[1])
 
         return x, y
 
-    def internal_step(self, action: Union[Tuple[int, int], bool]) -> Tuple[np.ndarray, float, bool, dict]:
-        self.click_connection_parent.send(action)
+    def get_internal_action(self, action: Union[Action, int, None]) -> Action:
+        # Translates the action given to step() into the action that is sent to the application process, which is
+        # either a tuple of coordinates, True for a click on a random widget, or a list of these for a macro action. The
+        # random clickers need no action (None) and GUIEnvGrid gets the number of a cell
+        return action
+
+    def _send_action(self, action: Action):
+        if isinstance(action, list) and len(action) == 0:
+            raise ValueError("A macro action needs at least one click")
+
+        if self.record_timings:
+            # Drops the timings of a previous reset, only steps are recorded
+            self.phase_timer.pop()
 
-        if isinstance(action, bool):
-            reward, x, y, increased_delay = self.click_connection_parent.recv()
+        with measure(self.phase_timer, "send_action"):
+            self.channel.send_step(action)
+
+    def _receive_step_result(self, action: Action) -> Tuple[np.ndarray, float, dict]:
+        # The response contains the click result and the observation after the click
+        response = self.channel.receive_response()
+        assert response.response_type == RESPONSE_STEP
+
+        if isinstance(action, list):
+            # Macro action, the reward of the step is the sum of the rewards of the clicks
+            click_results = response.extras["click_results"]
+
+            rewards = [reward for reward, _, _, _ in click_results]
+            clicks = [(x, y) for _, x, y, _ in click_results]
+
+            reward = sum(rewards)
+            info = {"x": response.x, "y": response.y, "clicks": clicks, "rewards": rewards}
+
+            if self.intermediate_observations:
+                info["intermediate_observations"] = response.extras["intermediate_observations"]
         else:
-            reward, increased_delay = self.click_connection_parent.recv()
-            x = action[0]
-            y = action[1]
+            reward = response.reward
+            info = {"x": response.x, "y": response.y}
+
+        observation = self._receive_observation(response)
+
+        return observation, reward, info
 
-        info = {"x": x, "y": y}
+    def _check_no_pending_call(self):
+        if self.pending_action is not None:
+            raise RuntimeError("A step is still pending, call step_wait() first")
+        if self.pending_reset:
+            raise RuntimeError("A reset is still pending, call reset_wait() first")
 
-        self.screenshot_connection_parent.send(increased_delay)
-        observation = self.screenshot_connection_parent.recv()
+    def _wait_for_response(self, timeout: Optional[float]):
+        # Raises if the response has not arrived after timeout seconds, the call can then simply be repeated
+        if timeout is not None and not self.channel.connection.poll(timeout):
+            raise TimeoutError(f"The application process has not responded after {timeout} seconds")
+
+    def _start_step(self, action: Action):
+        self._check_no_pending_call()
+
+        self.step_start_time = time.perf_counter()
+        self._send_action(action)
+        self.pending_action = action
+
+    def _finish_step(self) -> Tuple[np.ndarray, float, bool, dict]:
+        action, self.pending_action = self.pending_action, None
+        observation, reward, info = self._receive_step_result(action)
+
+        if self.record_timings:
+            # From sending the action until the result has been received, including the time the caller spent between
+            # step_async() and step_wait()
+            self.phase_timer.add("step", time.perf_counter() - self.step_start_time)
+
+        info.update(self._get_observation_info())
 
         return observation, reward, False, info
 
-    def step(self, action: Tuple[int, int]) -> Tuple[np.ndarray, float, bool, dict]:
-        observation, reward, done, info = self.internal_step(action)
+    def internal_step(self, action: Action) -> Tuple[np.ndarray, float, bool, dict]:
+        self._start_step(action)
+
+        return self._finish_step()
+
+    def step(self, action: Union[Action, int, None] = None) -> Tuple[np.ndarray, float, bool, dict]:
+        observation, reward, done, info = self.internal_step(self.get_internal_action(action))
 
         return observation, reward, done, info
 
-    def reset(self):
-        if self.terminate_connection_parent is not None:
+    def step_async(self, action: Union[Action, int, None] = None):
+        """
+        Sends the action to the application process and returns right away, while the application executes the click,
+        waits for the GUI to settle and takes the observation. The result has to be received with step_wait() before
+        the next step or reset.
+        """
+        self._start_step(self.get_internal_action(action))
+
+    def step_wait(self, timeout: float = None) -> Tuple[np.ndarray, float, bool, dict]:
+        """
+        Returns the result of the step that was started with step_async(), as step() does. With a timeout, a
+        TimeoutError is raised if the result has not arrived after timeout seconds (0 only polls), and step_wait() can
+        be called again later.
+        """
+        if self.pending_action is None:
+            raise RuntimeError("No step is pending, call step_async() first")
+
+        self._wait_for_response(timeout)
+
+        return self._finish_step()
+
+    def _check_hard_reset_possible(self):
+        if self.window_group is not None and self.channel is not None:
+            raise RuntimeError("Hard resets are not possible if the application process is shared with other "
+                               "environments")
+
+    def _restart_application_process(self):
+        self._check_hard_reset_possible()
+
+        if self.channel is not None:
             self._stop_application_process()
 
         self._initialize()
 
-        initial_observation = self.screenshot_connection_parent.recv()
+    def _can_soft_reset(self) -> bool:
+        if not self.soft_reset or self.channel is None:
+            return False
+
+        return self.hard_reset_interval is None or self.episodes_in_application_process < self.hard_reset_interval
+
+    def _start_reset(self, hard_reset: bool = False):
+        # The initial observation can then be received with _receive_initial_observation()
+        if self.initial_observation_pending:
+            # The application process has been started by another environment of the window group
+            self.initial_observation_pending = False
+            self.episodes_in_application_process = 1
+        elif not hard_reset and self._can_soft_reset():
+            self.channel.send_reset()
+            self.episodes_in_application_process += 1
+        else:
+            self._restart_application_process()
+            self.episodes_in_application_process = 1
+
+    def reset(self, hard_reset: bool = False):
+        self.reset_async(hard_reset)
+
+        return self.reset_wait()
+
+    def reset_async(self, hard_reset: bool = False):
+        """
+        Starts the reset and returns without waiting for the initial observation, which has to be received with
+        reset_wait(). A hard reset still waits until the previous application process has been stopped, but not for
+        the startup of the new one.
+        """
+        self._check_no_pending_call()
+
+        self._start_reset(hard_reset)
+        self.pending_reset = True
+
+    def reset_wait(self, timeout: float = None) -> np.ndarray:
+        """
+        Returns the initial observation of the reset that was started with reset_async(). With a timeout, a TimeoutError
+        is raised if it has not arrived after timeout seconds, and reset_wait() can be called again later.
+        """
+        if not self.pending_reset:
+            raise RuntimeError("No reset is pending, call reset_async() first")
 
-        return initial_observation
+        self._wait_for_response(timeout)
+        self.pending_reset = False
+
+        return self._receive_initial_observation()
 
     def render(self, mode="human"):
         pass
 
     def close(self):
         self._stop_application_process()
+        self._close()
+
+    def _close(self):
+        # Everything of close() after the application process has been stopped
+        if self.record_timings:
+            if self.timings_file_path is not None:
+                self.timing_statistics.dump(self.timings_file_path)
+            else:
+                logging.info(f"Step timings: {self.timing_statistics.summary()}")
+
+        for application_process in self.spare_application_processes:
+            application_process.kill()
+        self.spare_application_processes = []
 
         logging.debug("Closed application process, closing environment now")
 
         super().close()
 
+    async def _wait_for_response_async(self):
+        # Waits until the next response can be received, without blocking the event loop
+        connection = self.channel.connection
+        if connection.poll(0):
+            return
+
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+
+        def on_readable():
+            if not readable.done():
+                readable.set_result(None)
+
+        try:
+            loop.add_reader(self.channel.fileno(), on_readable)
+        except NotImplementedError:
+            # Event loops without add_reader() (e.g. the proactor event loop on Windows) wait in a thread instead
+            await loop.run_in_executor(None, connection.poll, None)
+            return
+
+        try:
+            await readable
+        finally:
+            loop.remove_reader(self.channel.fileno())
+
+    async def astep(self, action: Union[Action, int, None] = None) -> Tuple[np.ndarray, float, bool, dict]:
+        """
+        Coroutine version of step(), waits for the result on the event loop, so many environments can be stepped
+        concurrently from one thread. If it is cancelled while waiting, the step stays pending and its result can
+        still be received with step_wait().
+        """
+        self.step_async(action)
+        await self._wait_for_response_async()
+
+        return self.step_wait()
+
+    async def areset(self, hard_reset: bool = False) -> np.ndarray:
+        """
+        Coroutine version of reset(). The previous application process of a hard reset is also stopped without
+        blocking the event loop, only starting the new process blocks briefly.
+        """
+        self._check_no_pending_call()
+
+        if (self.channel is not None and not self.initial_observation_pending
+                and (hard_reset or not self._can_soft_reset())):
+            self._check_hard_reset_possible()
+            await self._astop_application_process()
+
+        self.reset_async(hard_reset)
+        await self._wait_for_response_async()
+
+        return self.reset_wait()
+
+    async def aclose(self):
+        # Coroutine version of close()
+        await self._astop_application_process()
+        self._close()
+
     def seed(self, seed=None):
         self.random_state = np.random.RandomState(seed)
-        return super().seed(seed)
+        seeds = super().seed(seed)
+        self.np_random_seed = seeds[0]
+        return seeds
 
 
 class GUIEnvRandomClick(GUIEnv):
 
-    def step(self, action: bool = None) -> Tuple[np.ndarray, float, bool, dict]:
-        x, y = self.sample_random_coordinates()
-
-        observation, reward, done, info = self.internal_step((x, y))
-
-        return observation, reward, done, info
+    def get_internal_action(self, action: bool = None) -> Tuple[int, int]:
+        return self.sample_random_coordinates()
 
     @staticmethod
     def get_clicker_type():
@@ -305,24 +1276,69 @@ class GUIEnvRandomWidget(GUIEnv):
         super().__init__(**kwargs)
         self.random_click_probability = random_click_probability
 
-    def step(self, action: bool = None) -> Tuple[np.ndarray, float, bool, dict]:
+    def get_internal_action(self, action: bool = None) -> Union[Tuple[int, int], bool]:
         if self.random_state.rand() < self.random_click_probability:
             # Random click
             logging.debug("Selecting random click")
-            x, y = self.sample_random_coordinates()
+            return self.sample_random_coordinates()
 
-            observation, reward, done, info = self.internal_step((x, y))
+        # Random widget, info of the step contains the selected x and y coordinates
+        logging.debug("Selecting random widget")
+        return True
 
-            return observation, reward, done, info
-        else:
-            # Random widget
-            logging.debug("Selecting random widget")
+    @staticmethod
+    def get_clicker_type():
+        return "random-widgets"
+
+
+class GUIEnvGrid(GUIEnv):
+    """
+    Discrete actions: the main window is divided into a grid of grid_shape (rows, columns) cells, and the action is the
+    number of the cell (row by row) whose center is clicked.
 
-            # Info contains the selected x and y coordinates
-            observation, reward, done, info = self.internal_step(True)
+    The info of each step contains the grid action mask as a flat boolean array with one entry per action. With
+    merge_duplicate_cells, only the first of several cells that land on the same widget is True, the widgets of the
+    cells are looked up in the hit map of the application. Cells on different items of an item view, like the list of
+    an opened combo box, are not merged.
+    """
 
-            return observation, reward, done, info
+    def __init__(self, grid_shape: Tuple[int, int] = (8, 8), merge_duplicate_cells: bool = True, **kwargs):
+        required_kwargs = {"use_hit_map": True, "action_mask": "grid", "action_mask_grid_shape": grid_shape}
+
+        for key, value in required_kwargs.items():
+            if key in kwargs and kwargs[key] != value:
+                raise ValueError(f"GUIEnvGrid requires {key}={value!r}, got {kwargs[key]!r}")
+
+        kwargs.update(required_kwargs)
+        super().__init__(**kwargs)
+
+        self.grid_shape = grid_shape
+        self.merge_duplicate_cells = merge_duplicate_cells
+        self.action_space = gym.spaces.Discrete(grid_shape[0] * grid_shape[1])
+
+        x, y = get_grid_cell_centers(WINDOW_SIZE, grid_shape)
+        self.cell_click_points = [(int(cell_x), int(cell_y)) for cell_y in y for cell_x in x]
+
+        # Created in the application process, where the hit map exists
+        self.cell_table: CellTable = None
+
+    def get_internal_action(self, action: int) -> Tuple[int, int]:
+        return self.cell_click_points[action]
+
+    @Slot()
+    def _create_action_mask(self):
+        super()._create_action_mask()
+        action_mask = self.register_click_thread.action_mask.ravel()
+
+        if self.merge_duplicate_cells:
+            if self.cell_table is None:
+                self.cell_table = CellTable(self.hit_map, WINDOW_SIZE, self.grid_shape)
+
+            self.cell_table.update()
+            action_mask = action_mask & self.cell_table.representative_cells
+
+        self.register_click_thread.action_mask = action_mask
 
     @staticmethod
     def get_clicker_type():
-        return "random-widgets"
+        return "grid"
@@ -0,0 +1,156 @@
+import logging
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from gym_gui_environments.pyside_gui_environments.gui_env import GUIEnv
+
+
+class GUIVectorEnv:
+    """
+    Steps several GUI environments, each with its own application process, at the same time. All actions are sent
+    before any reply is awaited, so the time the applications need to settle after a click overlaps instead of adding
+    up.
+
+    With windows_per_process, consecutive groups of that many environments share one application process, which hosts a
+    main window (with its own backends, settings dialog and coverage measurement) for each of them. This saves the
+    memory and the startup of an interpreter, PySide6 and the QApplication per environment, but the windows of a process
+    are stepped one after another. Only soft resets are possible then, and the windows, which lie on top of each other,
+    are rendered with capture_mode="render" and clicked through their hit maps.
+    """
+
+    def __init__(self, num_envs: int, env_class: Type[GUIEnv] = GUIEnv, copy: bool = True,
+                 windows_per_process: int = 1, **env_kwargs):
+        if windows_per_process < 1:
+            raise ValueError(f"windows_per_process must be at least 1, got {windows_per_process}")
+
+        if windows_per_process > 1:
+            for key in ["hard_reset_interval", "spare_application_processes", "use_sys_monitoring_coverage"]:
+                if env_kwargs.get(key):
+                    raise ValueError(f"'{key}' cannot be used with several windows per application process")
+
+            if env_kwargs.get("capture_mode", "render") != "render":
+                raise ValueError("Several windows per application process can only be captured with "
+                                 "capture_mode='render'")
+
+            # A hard reset would restart the windows of the other environments as well
+            env_kwargs["soft_reset"] = True
+            # Neither grabbing the screen nor QApplication.widgetAt() can tell the overlapping windows apart
+            env_kwargs["capture_mode"] = "render"
+            env_kwargs["use_hit_map"] = True
+
+        self.num_envs = num_envs
+        self.envs = [env_class(**env_kwargs) for _ in range(num_envs)]
+
+        self.windows_per_process = windows_per_process
+        if windows_per_process > 1:
+            for start in range(0, num_envs, windows_per_process):
+                window_group = self.envs[start:start + windows_per_process]
+                for env in window_group:
+                    env.window_group = window_group
+
+        # If False, step() and reset() return the same observation buffer every time, which is overwritten by the next
+        # call
+        self.copy = copy
+        observation_space = self.envs[0].observation_space
+        self.observations = np.zeros((num_envs,) + observation_space.shape, dtype=observation_space.dtype)
+
+        # Results of the current step, filled in as the environments answer
+        self.rewards = np.zeros(num_envs, dtype=np.float64)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.infos: List[dict] = [{} for _ in range(num_envs)]
+
+        # Connections of the environments whose response to the last step_async() or reset_async() is still missing
+        self.pending: Dict[Connection, int] = {}
+
+    def _get_observations(self) -> np.ndarray:
+        if self.copy:
+            return self.observations.copy()
+        return self.observations
+
+    def _wait_for_envs(self, timeout: Optional[float], receive: Callable[[int], None]):
+        # Receives the responses in the order they arrive, the environments that have answered are removed from
+        # self.pending, so after a TimeoutError the remaining ones can be waited for again
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while self.pending:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            ready = wait(list(self.pending), remaining)
+
+            if not ready:
+                raise TimeoutError(f"{len(self.pending)} environments have not responded after {timeout} seconds")
+
+            for conn in ready:
+                receive(self.pending.pop(conn))
+
+    def reset(self, hard_reset: bool = False) -> np.ndarray:
+        self.reset_async(hard_reset)
+
+        return self.reset_wait()
+
+    def reset_async(self, hard_reset: bool = False):
+        # Reset all applications first, then collect their initial observations in the order they arrive
+        for env in self.envs:
+            env.reset_async(hard_reset)
+
+        self.pending = {env.channel.connection: i for i, env in enumerate(self.envs)}
+
+    def reset_wait(self, timeout: float = None) -> np.ndarray:
+        def receive(i: int):
+            self.observations[i] = self.envs[i].reset_wait()
+
+        self._wait_for_envs(timeout, receive)
+
+        return self._get_observations()
+
+    def step(self, actions: Sequence = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[dict]]:
+        self.step_async(actions)
+
+        return self.step_wait()
+
+    def step_async(self, actions: Sequence = None):
+        if actions is None:
+            # The random clickers do not need an action
+            actions = [None] * self.num_envs
+
+        assert len(actions) == self.num_envs
+
+        for env, action in zip(self.envs, actions):
+            env.step_async(action)
+
+        self.rewards = np.zeros(self.num_envs, dtype=np.float64)
+        self.dones = np.zeros(self.num_envs, dtype=bool)
+        self.infos = [{} for _ in range(self.num_envs)]
+
+        self.pending = {env.channel.connection: i for i, env in enumerate(self.envs)}
+
+    def step_wait(self, timeout: float = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[dict]]:
+        """
+        Returns the results of the steps started with step_async(), once all environments have answered. With a timeout,
+        a TimeoutError is raised if some have not answered after timeout seconds, the results received so far are kept
+        and step_wait() can be called again to wait for the rest.
+        """
+        def receive(i: int):
+            self.observations[i], self.rewards[i], self.dones[i], self.infos[i] = self.envs[i].step_wait()
+
+        self._wait_for_envs(timeout, receive)
+
+        return self._get_observations(), self.rewards, self.dones, self.infos
+
+    def close(self):
+        for env in self.envs:
+            env.close()
+
+        logging.debug("Closed all environments of the vectorized environment")
+
+    def wait_for_html_reports(self, timeout: float = None) -> List[str]:
+        # The timeout applies to each environment separately
+        return [directory for env in self.envs for directory in env.wait_for_html_reports(timeout)]
+
+    def seed(self, seed: int = None) -> List:
+        if seed is None:
+            return [env.seed(None) for env in self.envs]
+
+        return [env.seed(seed + i) for i, env in enumerate(self.envs)]
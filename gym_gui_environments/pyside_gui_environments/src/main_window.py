@@ -1,13 +1,11 @@
 import importlib.resources
 import logging
-import os
 import sys
 from functools import partial
 from typing import List, Union, Tuple
 
-import coverage.exceptions
 import numpy as np
-from PySide6.QtCore import Qt, QPoint, Slot, Signal
+from PySide6.QtCore import Qt, QEvent, QObject, QPoint, Slot, Signal
 from PySide6.QtGui import QAction, QFontDatabase
 from PySide6.QtTest import QTest
 from PySide6.QtWidgets import QApplication, QMainWindow, QMenuBar, QWidget, QComboBox
@@ -21,8 +19,13 @@ from gym_gui_environments.pyside_gui_environments.src.backend.figure_printer imp
                                                                                      toggle_figure_printer_widgets)
 from gym_gui_environments.pyside_gui_environments.src.backend.text_printer import TextPrinter
 from gym_gui_environments.pyside_gui_environments.src.settings_dialog import SettingsDialog
+from gym_gui_environments.pyside_gui_environments.src.utils.coverage_reward import CoverageRewardEngine
+from gym_gui_environments.pyside_gui_environments.src.utils.hit_map import HitMap
 from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
-from gym_gui_environments.pyside_gui_environments.src.utils.utils import load_ui, do_nothing_function
+from gym_gui_environments.pyside_gui_environments.src.utils.settle_timeout_model import SettleTimeoutModel
+from gym_gui_environments.pyside_gui_environments.src.utils.step_timings import PhaseTimer, measure
+from gym_gui_environments.pyside_gui_environments.src.utils.utils import (load_ui, do_nothing_function,
+                                                                         get_active_modal_widget)
 from gym_gui_environments.pyside_gui_environments.window_configuration import WINDOW_SIZE
 
 
@@ -69,6 +72,7 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.main_window)
 
         self.coverage_measurer = coverage_measurer
+        self.coverage_reward_engine = CoverageRewardEngine(coverage_measurer)
         self.old_coverage_percentage = 0
 
         self.paint_event_filter = paint_event_filter
@@ -79,6 +83,15 @@ class MainWindow(QMainWindow):
         # Keep track of an open combo box to close it when clicked somewhere else
         self.open_combobox = None
 
+        # If set, the clicked widgets are looked up in this HitMap instead of with QApplication.widgetAt()
+        self.hit_map: HitMap = None
+
+        # If set, the durations of the click and the coverage measurement are recorded with this PhaseTimer
+        self.phase_timer: PhaseTimer = None
+
+        # If set, the paint duration after each click is measured with this model, which then adapts the wait budgets
+        self.settle_timeout_model: SettleTimeoutModel = None
+
         self.i = 0
 
     def _initialize(self):
@@ -230,15 +243,11 @@ class MainWindow(QMainWindow):
         self.currently_shown_widgets_main_window = currently_shown_widgets_main_window
 
     def get_current_coverage_percentage(self):
-        with open(os.devnull, "w") as f:
-            try:
-                coverage_percentage = self.coverage_measurer.report(file=f)
-            except coverage.exceptions.CoverageException:
-                # Is thrown when nothing was ever recorded by the coverage object
-                coverage_percentage = 0
-        return coverage_percentage
+        # Equals the percentage of Coverage.report(), but does not analyze all source files again
+        return self.coverage_reward_engine.get_coverage_percentage()
 
     def calculate_coverage_increase(self):
+        self.coverage_reward_engine.update()
         new_coverage_percentage = self.get_current_coverage_percentage()
         reward = new_coverage_percentage - self.old_coverage_percentage
         self.old_coverage_percentage = new_coverage_percentage
@@ -269,7 +278,7 @@ class MainWindow(QMainWindow):
         closed_combobox = False
         click_outside_modal_widget = False
         # Use this to check which click function should be used and later if additional delay is needed
-        current_active_modal_widget = QApplication.activeModalWidget()
+        current_active_modal_widget = get_active_modal_widget(self)
 
         # If we have an open combo box and click somewhere else in the window, the combo box must be closed.
         # QTest.mouseClick() ignores this unfortunately, therefore we have to manually close it
@@ -302,9 +311,12 @@ class MainWindow(QMainWindow):
                     click_function = do_nothing_function
                     logging.debug(f"{self.i}: Is not an ancestor, set click function to do nothing function")
 
-        self.coverage_measurer.start()
-        click_function()
-        self.coverage_measurer.stop()
+        with measure(self.phase_timer, "coverage_start"):
+            self.coverage_measurer.start()
+        with measure(self.phase_timer, "mouse_click"):
+            click_function()
+        with measure(self.phase_timer, "coverage_stop"):
+            self.coverage_measurer.stop()
 
         if (isinstance(recv_widget, QComboBox)
                 and not closed_combobox
@@ -318,26 +330,63 @@ class MainWindow(QMainWindow):
             self.open_combobox = recv_widget
             logging.debug(f"{self.i}: Set open combobox to {self.open_combobox}")
 
-        reward = self.calculate_coverage_increase()
+            # Notices when the popup is closed by something else than a click of this main window
+            self.open_combobox.view().window().installEventFilter(self)
+
+        with measure(self.phase_timer, "coverage_increase"):
+            reward = self.calculate_coverage_increase()
 
         increased_delay: bool = (
                 closed_combobox
                 or self.open_combobox is not None
                 or isinstance(recv_widget, QAction)
                 or isinstance(recv_widget, QMenuBar)
-                or current_active_modal_widget != QApplication.activeModalWidget()  # Indicates a newly opened or closed
+                or current_active_modal_widget != get_active_modal_widget(self)  # Indicates a newly opened or closed
                                                                                     # modal widget
         )
 
+        if self.settle_timeout_model is not None:
+            if closed_combobox:
+                transition = "combobox_closed"
+            elif self.open_combobox is not None:
+                transition = "combobox_opened"
+            elif current_active_modal_widget != get_active_modal_widget(self):
+                transition = "modal_changed"
+            else:
+                transition = "none"
+
+            widget_class = "QAction" if isinstance(recv_widget, QAction) else recv_widget.metaObject().className()
+            self.settle_timeout_model.start(widget_class, transition)
+
         return reward, increased_delay
 
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        # Qt closes all open popups of the application when a window is activated. If several main windows share the
+        # application, opening a dialog in one of them therefore also closes the open combo box of another one. The
+        # clicks of this main window that close the combo box reset open_combobox before, so it is still set here only
+        # if the combo box has been closed from outside.
+        if (event.type() == QEvent.Hide and self.open_combobox is not None
+                and watched is self.open_combobox.view().window()):
+            logging.debug(f"{self.i}: Open combobox {self.open_combobox} has been closed from outside")
+            self.open_combobox = None
+
+        return super().eventFilter(watched, event)
+
+    def _find_widget_at(self, pos: QPoint) -> Tuple[QWidget, QPoint]:
+        # pos is relative to the main window, returns the widget at this position and the position relative to it
+        if self.hit_map is not None and self.rect().contains(pos):
+            return self.hit_map.widget_at(pos.x(), pos.y())
+
+        global_pos = self.mapToGlobal(pos)
+        recv_widget = QApplication.widgetAt(global_pos)
+
+        return recv_widget, recv_widget.mapFromGlobal(global_pos)
+
     def simulate_click(self, pos_x: int, pos_y: int) -> Tuple[float, bool]:
         pos = QPoint(pos_x, pos_y)
-        global_pos = self.mapToGlobal(pos)
-        logging.debug(f"{self.i}: Received position {pos}, mapped to global position {global_pos}")
+        logging.debug(f"{self.i}: Received position {pos}")
 
-        recv_widget = QApplication.widgetAt(global_pos)
-        local_pos = recv_widget.mapFromGlobal(global_pos)
+        recv_widget, local_pos = self._find_widget_at(pos)
 
         logging.debug(f"{self.i}: Found widget {recv_widget}, mapped to local position {local_pos}")
 
@@ -348,7 +397,7 @@ class MainWindow(QMainWindow):
         return reward, increased_delay
 
     def simulate_click_on_random_widget(self) -> Tuple[float, int, int, bool]:
-        current_active_modal_widget = QApplication.activeModalWidget()
+        current_active_modal_widget = get_active_modal_widget(self)
 
         if current_active_modal_widget is not None:
             random_widget_list = current_active_modal_widget.currently_shown_widgets
@@ -384,10 +433,10 @@ class MainWindow(QMainWindow):
         else:
             global_pos = randomly_selected_widget.mapToGlobal(local_pos)
 
-        found_widget_at_point = QApplication.widgetAt(global_pos)
+        main_window_pos = self.mapFromGlobal(global_pos)
+        found_widget_at_point, new_local_pos = self._find_widget_at(main_window_pos)
 
         if not found_widget_at_point == randomly_selected_widget and not isinstance(randomly_selected_widget, QAction):
-            new_local_pos = found_widget_at_point.mapFromGlobal(global_pos)
             logging.debug(
                 f"NOT EQUAL: Found widget {found_widget_at_point} at click point where randomly selected widget " +
                 f"{randomly_selected_widget} was set to be clicked. Compare old local_pos {local_pos} with " +
@@ -398,7 +447,6 @@ class MainWindow(QMainWindow):
 
         reward, increased_delay = self.execute_mouse_click(randomly_selected_widget, local_pos)
 
-        main_window_pos = self.mapFromGlobal(global_pos)
         logging.debug(f"{self.i}: Randomly selected widget '{randomly_selected_widget}' with local " +
                       f"position '{local_pos}', global position '{global_pos}' and main window " +
                       f"position '{main_window_pos}'")
@@ -407,11 +455,33 @@ class MainWindow(QMainWindow):
 
         return reward, main_window_pos.x(), main_window_pos.y(), increased_delay
 
-    def generate_html_report(self, directory: str):
-        try:
-            self.coverage_measurer.html_report(directory=directory, precision=4)
-        except coverage.exceptions.CoverageException:
-            logging.debug("Did not create an HTML report because nothing was measured")
+    def get_clickable_boxes(self) -> np.ndarray:
+        """
+        Returns the bounding boxes (x, y, width, height) relative to the main window of the widgets that can currently
+        be clicked meaningfully. These are the same widgets that simulate_click_on_random_widget() chooses from.
+        """
+        current_active_modal_widget = get_active_modal_widget(self)
+
+        if current_active_modal_widget is not None:
+            widgets = list(current_active_modal_widget.currently_shown_widgets)
+        else:
+            widgets = list(self.currently_shown_widgets_main_window)
+
+        if self.open_combobox is not None:
+            # The items of an open combo box are in its popup
+            widgets.append(self.open_combobox.view().viewport())
+
+        boxes = []
+        for widget in widgets:
+            if isinstance(widget, QAction):
+                rectangle = self.menu_bar.actionGeometry(widget)
+                top_left = self.menu_bar.mapTo(self, rectangle.topLeft())
+                boxes.append((top_left.x(), top_left.y(), rectangle.width(), rectangle.height()))
+            elif widget.isVisible():
+                top_left = self.mapFromGlobal(widget.mapToGlobal(QPoint(0, 0)))
+                boxes.append((top_left.x(), top_left.y(), widget.width(), widget.height()))
+
+        return np.array(boxes, dtype=np.int32).reshape((-1, 4))
 
 
 def main():  # pragma: no cover
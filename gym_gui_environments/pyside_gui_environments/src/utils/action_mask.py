@@ -0,0 +1,55 @@
+from typing import Tuple
+
+import numpy as np
+
+ACTION_MASK_TYPES = ["boxes", "grid", "pixels"]
+
+
+def clip_boxes(boxes: np.ndarray, window_size: Tuple[int, int]) -> np.ndarray:
+    # Boxes are (x, y, width, height), parts outside the window are removed and boxes that are completely outside are
+    # dropped
+    left = np.clip(boxes[:, 0], 0, window_size[0])
+    top = np.clip(boxes[:, 1], 0, window_size[1])
+    right = np.clip(boxes[:, 0] + boxes[:, 2], 0, window_size[0])
+    bottom = np.clip(boxes[:, 1] + boxes[:, 3], 0, window_size[1])
+
+    clipped_boxes = np.stack([left, top, right - left, bottom - top], axis=1).astype(np.int32)
+    return clipped_boxes[(clipped_boxes[:, 2] > 0) & (clipped_boxes[:, 3] > 0)]
+
+
+def get_grid_cell_centers(window_size: Tuple[int, int], grid_shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    # Click points of the grid cells, rows and columns are distributed evenly over the window
+    rows, columns = grid_shape
+    x = ((np.arange(columns) + 0.5) * window_size[0] / columns).astype(np.int32)
+    y = ((np.arange(rows) + 0.5) * window_size[1] / rows).astype(np.int32)
+    return x, y
+
+
+def create_action_mask(boxes: np.ndarray, action_mask_type: str, window_size: Tuple[int, int],
+                       grid_shape: Tuple[int, int] = None) -> np.ndarray:
+    """
+    Converts the bounding boxes (x, y, width, height) of the widgets that can be clicked meaningfully into the action
+    mask:
+      - "boxes": the boxes themselves, clipped to the window, as an int32 array of shape (n, 4)
+      - "grid": a boolean array of shape grid_shape (rows, columns), a cell is True if its center lies in a box
+      - "pixels": a boolean array of shape (height, width) of the window
+    """
+    boxes = clip_boxes(boxes, window_size)
+
+    if action_mask_type == "boxes":
+        return boxes
+    elif action_mask_type == "grid":
+        x, y = get_grid_cell_centers(window_size, grid_shape)
+
+        in_box_x = (x[np.newaxis, :] >= boxes[:, 0:1]) & (x[np.newaxis, :] < boxes[:, 0:1] + boxes[:, 2:3])
+        in_box_y = (y[np.newaxis, :] >= boxes[:, 1:2]) & (y[np.newaxis, :] < boxes[:, 1:2] + boxes[:, 3:4])
+
+        # (boxes, rows, columns), a cell is covered if any box contains its center
+        return (in_box_y[:, :, np.newaxis] & in_box_x[:, np.newaxis, :]).any(axis=0)
+    elif action_mask_type == "pixels":
+        mask = np.zeros((window_size[1], window_size[0]), dtype=bool)
+        for x, y, width, height in boxes:
+            mask[y:y + height, x:x + width] = True
+        return mask
+
+    raise ValueError(f"Unknown action mask type '{action_mask_type}', choose from {ACTION_MASK_TYPES}")
@@ -0,0 +1,75 @@
+from typing import Tuple
+
+import numpy as np
+from PySide6.QtCore import QPoint
+from PySide6.QtWidgets import QAbstractItemView
+
+from gym_gui_environments.pyside_gui_environments.src.utils.action_mask import get_grid_cell_centers
+from gym_gui_environments.pyside_gui_environments.src.utils.hit_map import HitMap
+
+
+class CellTable:
+    """
+    Maps the cells of a grid over the main window to their click point (the cell center) and the target that receives a
+    click there. The targets are read from the hit map, so the table is only rebuilt when the hit map has been rebuilt,
+    i.e. after the visible widgets have changed.
+
+    The target of a cell is its widget, and additionally the item below the cell center if the widget is the viewport
+    of an item view, e.g. the list of an opened combo box, where each item leads to a different click. Cells are
+    numbered row by row. Of several cells that land on the same target only the first one is a representative cell, the
+    others would lead to the same click.
+    """
+
+    def __init__(self, hit_map: HitMap, window_size: Tuple[int, int], grid_shape: Tuple[int, int]):
+        self.hit_map = hit_map
+        self.grid_shape = grid_shape
+
+        x, y = get_grid_cell_centers(window_size, grid_shape)
+        self.cell_x = np.tile(x, grid_shape[0])
+        self.cell_y = np.repeat(y, grid_shape[1])
+
+        number_of_cells = grid_shape[0] * grid_shape[1]
+        self.widget_ids = np.zeros(number_of_cells, dtype=np.int32)
+        # Number of the item below the cell center among the items of its item view, -1 outside of items
+        self.item_ids = np.full(number_of_cells, -1, dtype=np.int32)
+        self.representative_cells = np.zeros(number_of_cells, dtype=bool)
+
+        self.hit_map_version = None
+
+    def _update_item_ids(self):
+        self.item_ids = np.full(len(self.widget_ids), -1, dtype=np.int32)
+
+        for widget_id in np.unique(self.widget_ids):
+            widget = self.hit_map.widgets[widget_id]
+            view = widget.parent() if widget is not None else None
+
+            if not isinstance(view, QAbstractItemView) or view.viewport() is not widget:
+                continue
+
+            origin_x, origin_y = self.hit_map.widget_origins[widget_id]
+            items = {}
+
+            for cell in np.flatnonzero(self.widget_ids == widget_id):
+                index = view.indexAt(QPoint(int(self.cell_x[cell]) - origin_x, int(self.cell_y[cell]) - origin_y))
+
+                if index.isValid():
+                    item = (index.row(), index.column(), index.internalId())
+                    self.item_ids[cell] = items.setdefault(item, len(items))
+
+    def update(self):
+        self.hit_map.update()
+
+        if self.hit_map_version == self.hit_map.version:
+            return
+
+        self.widget_ids = self.hit_map.widget_ids[self.cell_y, self.cell_x]
+        self._update_item_ids()
+
+        targets = np.stack([self.widget_ids, self.item_ids], axis=1)
+        _, first_cells = np.unique(targets, axis=0, return_index=True)
+        self.representative_cells.fill(False)
+        self.representative_cells[first_cells] = True
+        # Cells without any widget below them cannot be clicked meaningfully at all
+        self.representative_cells[self.widget_ids == 0] = False
+
+        self.hit_map_version = self.hit_map.version
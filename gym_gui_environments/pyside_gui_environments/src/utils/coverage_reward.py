@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+from coverage import Coverage
+
+from gym_gui_environments.pyside_gui_environments.src.utils.sys_monitoring_coverage import SysMonitoringCoverage
+
+
+class CoverageRewardEngine:
+    """
+    Keeps track of the line coverage without creating a coverage report on every step.
+
+    The executable statements of each measured file are determined only once (the first time the file shows up in the
+    coverage data). For every file a boolean array indexed by the line number marks the statements and another one marks
+    the statements that have been covered so far. An update therefore only looks at executed lines and never analyzes
+    the source code again. With coverage.py these are all lines that have been executed so far in the episode, because
+    its data is cumulative, with the sys.monitoring collector only the lines that were executed for the first time
+    since the last update.
+
+    The coverage percentage is calculated the same way as Coverage.report() does (without branch coverage), so both
+    return exactly the same value.
+    """
+
+    def __init__(self, coverage_measurer: Union[Coverage, SysMonitoringCoverage]):
+        self.coverage_measurer = coverage_measurer
+
+        self.statements: Dict[str, np.ndarray] = {}
+        self.covered_statements: Dict[str, np.ndarray] = {}
+
+        self.number_of_statements = 0
+        self.number_of_covered_statements = 0
+
+        # The first update has to use all lines, the sys.monitoring collector could have been erased and restored from
+        # a snapshot in the meantime, which does not count as new lines
+        self._add_executed_lines(self._get_all_executed_lines())
+
+    def _add_file(self, file_name: str):
+        _, statements, _, _, _ = self.coverage_measurer.analysis2(file_name)
+
+        is_statement = np.zeros(max(statements, default=0) + 1, dtype=bool)
+        is_statement[statements] = True
+
+        self.statements[file_name] = is_statement
+        self.covered_statements[file_name] = np.zeros_like(is_statement)
+        self.number_of_statements += len(statements)
+
+    def _get_executed_lines(self) -> Iterable[Tuple[str, Iterable[int]]]:
+        if isinstance(self.coverage_measurer, SysMonitoringCoverage):
+            # Contains only the lines that have been executed for the first time since the last update
+            return self.coverage_measurer.drain_new_lines().items()
+
+        return self._get_all_executed_lines()
+
+    def _get_all_executed_lines(self) -> Iterable[Tuple[str, Iterable[int]]]:
+        data = self.coverage_measurer.get_data()
+
+        for file_name in data.measured_files():
+            yield file_name, data.lines(file_name)
+
+    def update(self) -> int:
+        """
+        Adds the lines that have been executed since the last update and returns the number of newly covered statements.
+        """
+        return self._add_executed_lines(self._get_executed_lines())
+
+    def _add_executed_lines(self, executed_lines: Iterable[Tuple[str, Iterable[int]]]) -> int:
+        newly_covered_statements = 0
+
+        for file_name, lines in executed_lines:
+            if file_name not in self.statements:
+                self._add_file(file_name)
+
+            is_statement = self.statements[file_name]
+            covered_statements = self.covered_statements[file_name]
+
+            lines = np.fromiter(lines, dtype=np.int64)
+            # Executed lines that are not statements (for example excluded lines) are ignored
+            lines = lines[(lines > 0) & (lines < len(is_statement))]
+            lines = lines[is_statement[lines] & ~covered_statements[lines]]
+
+            covered_statements[lines] = True
+            newly_covered_statements += len(lines)
+
+        self.number_of_covered_statements += newly_covered_statements
+
+        return newly_covered_statements
+
+    def get_coverage_percentage(self) -> float:
+        if not self.statements:
+            # Coverage.report() raises an exception when nothing was recorded yet
+            return 0
+
+        if self.number_of_statements == 0:
+            return 100.0
+
+        return (100.0 * self.number_of_covered_statements) / self.number_of_statements
+
+
+def get_coverage_snapshot(coverage_measurer: Union[Coverage, SysMonitoringCoverage]) -> Dict[str, List[int]]:
+    data = coverage_measurer.get_data()
+    return {file_name: data.lines(file_name) for file_name in data.measured_files()}
+
+
+def restore_coverage_snapshot(coverage_measurer: Union[Coverage, SysMonitoringCoverage],
+                              snapshot: Dict[str, List[int]]):
+    # Discards everything that was measured after the snapshot has been taken
+    coverage_measurer.erase()
+    coverage_measurer.get_data().add_lines(snapshot)
@@ -0,0 +1,47 @@
+import importlib.resources
+from typing import Dict, List
+
+import numpy as np  # noqa: F401
+from PySide6 import QtCore, QtGui, QtTest, QtUiTools, QtWidgets  # noqa: F401
+
+from gym_gui_environments.pyside_gui_environments.src.utils.coverage_reward import get_coverage_snapshot
+from gym_gui_environments.pyside_gui_environments.src.utils.sys_monitoring_coverage import create_coverage_measurer
+from gym_gui_environments.pyside_gui_environments.src.utils.utils import preload_ui_file
+
+# This module is imported by the forkserver (launcher="forkserver" in GUIEnv) before it forks the first application
+# process, and must not be imported anywhere else. Everything the application processes need is imported here once:
+# PySide6, coverage, numpy and the application itself. The .ui files are read into memory as well. Creating widgets from
+# them requires a QApplication, which must not exist in the forkserver, so they are still loaded in each application
+# process, but without accessing the file system.
+
+UI_FILES = [
+    ("gym_gui_environments.pyside_gui_environments.src", "main_window.ui"),
+    ("gym_gui_environments.pyside_gui_environments.src", "settings_dialog.ui"),
+    ("gym_gui_environments.pyside_gui_environments.src.utils", "confirmation_dialog.ui"),
+    ("gym_gui_environments.pyside_gui_environments.src.utils", "missing_content_dialog.ui"),
+    ("gym_gui_environments.pyside_gui_environments.src.utils", "warning_dialog.ui"),
+]
+
+
+def _import_application() -> Dict[str, List[int]]:
+    with importlib.resources.path("gym_gui_environments.pyside_gui_environments", ".coveragerc") as resource:
+        coveragerc_file_path = resource.__str__()
+
+    coverage_measurer = create_coverage_measurer(coveragerc_file_path)
+    coverage_measurer.start()
+    from gym_gui_environments.pyside_gui_environments.src.main_window import MainWindow  # noqa: F401
+    coverage_measurer.stop()
+
+    return get_coverage_snapshot(coverage_measurer)
+
+
+def _preload_ui_files():
+    for package, file_name in UI_FILES:
+        with importlib.resources.path(package, file_name) as resource:
+            preload_ui_file(resource.__str__())
+
+
+# The application is imported under coverage, because the forked processes do not execute the imports again. They
+# restore the coverage of the import from this snapshot instead.
+import_coverage_snapshot = _import_application()
+_preload_ui_files()
@@ -0,0 +1,233 @@
+import struct
+from multiprocessing import shared_memory
+from typing import List, Tuple
+
+import numpy as np
+
+OBSERVATION_TRANSPORTS = ["pipe", "shared_memory", "delta"]
+
+# If more than this fraction of the tiles has changed, the delta transport sends the whole frame instead
+DELTA_FULL_FRAME_THRESHOLD = 0.5
+
+# Slot index and sequence number of a frame in the shared memory ring buffer
+SHARED_MEMORY_HANDLE = struct.Struct("<IQ")
+
+# First byte of a delta message, an empty message means that nothing has changed
+DELTA_FULL_FRAME = b"\x01"
+DELTA_TILES = b"\x02"
+
+# y, x, height and width of a tile, followed by its pixels
+DELTA_TILE_HEADER = struct.Struct("<HHHH")
+
+
+class SharedMemoryRingBuffer:
+    """
+    Fixed number of equally shaped frames that live in a shared memory block. The environment process creates and owns
+    the block, the application process attaches to it by name (this happens automatically when the object is pickled
+    to the spawned process) and writes its screenshots into the slots one after another.
+
+    Every slot has a sequence number in front of the frame data, so the reader can check that the slot was not
+    overwritten in the meantime.
+    """
+
+    def __init__(self, frame_shape: Tuple[int, ...], dtype=np.uint8, number_of_slots: int = 4, name: str = None):
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.number_of_slots = number_of_slots
+
+        header_size = number_of_slots * np.dtype(np.int64).itemsize
+        frame_size = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        memory_size = header_size + number_of_slots * frame_size
+
+        self.owner = name is None
+
+        if self.owner:
+            self.shared_memory = shared_memory.SharedMemory(create=True, size=memory_size)
+        else:
+            self.shared_memory = shared_memory.SharedMemory(name=name)
+
+        self.sequence_numbers = np.ndarray((number_of_slots,), dtype=np.int64, buffer=self.shared_memory.buf)
+        self.frames = np.ndarray((number_of_slots, *self.frame_shape), dtype=self.dtype, buffer=self.shared_memory.buf,
+                                 offset=header_size)
+
+        if self.owner:
+            self.sequence_numbers[:] = -1
+
+        self.next_sequence_number = 0
+
+    def __reduce__(self):
+        # Only the name is transferred, the other process attaches to the same block instead of copying the frames
+        return self.__class__, (self.frame_shape, self.dtype, self.number_of_slots, self.shared_memory.name)
+
+    def write(self, frame: np.ndarray) -> Tuple[int, int]:
+        sequence_number = self.next_sequence_number
+        slot = sequence_number % self.number_of_slots
+
+        np.copyto(self.frames[slot], frame)
+        self.sequence_numbers[slot] = sequence_number
+
+        self.next_sequence_number += 1
+
+        return slot, sequence_number
+
+    def read(self, slot: int, sequence_number: int, copy: bool = True) -> np.ndarray:
+        if self.sequence_numbers[slot] != sequence_number:
+            raise RuntimeError(f"Frame {sequence_number} in slot {slot} has already been overwritten by frame "
+                               f"{self.sequence_numbers[slot]}")
+
+        if copy:
+            return self.frames[slot].copy()
+
+        return self.frames[slot]
+
+    def close(self):
+        del self.sequence_numbers
+        del self.frames
+
+        try:
+            self.shared_memory.close()
+        except BufferError:
+            # Views that were handed out with copy=False are still alive, the memory stays mapped until they are gone
+            pass
+
+        if self.owner:
+            self.shared_memory.unlink()
+
+
+class PipeFrameTransport:
+    """
+    Default transport, the raw bytes of the frame are sent through the pipe.
+    """
+
+    def __init__(self, frame_shape: Tuple[int, ...], dtype=np.uint8):
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+
+    def encode(self, frame: np.ndarray) -> List:
+        return [np.ascontiguousarray(frame)]
+
+    def decode(self, message: memoryview) -> np.ndarray:
+        # Copied, because the message is a view into the receive buffer of the channel
+        return np.frombuffer(message, dtype=self.dtype).reshape(self.frame_shape).copy()
+
+    def close(self):
+        pass
+
+
+class SharedMemoryFrameTransport:
+    """
+    Writes the frames into a SharedMemoryRingBuffer and only sends the slot index and the sequence number through the
+    pipe. With copy=False the decoded observation is a view into the ring buffer, which stays valid until the slot is
+    reused, i.e. for number_of_slots - 1 further observations.
+    """
+
+    def __init__(self, frame_shape: Tuple[int, ...], dtype=np.uint8, number_of_slots: int = 4, copy: bool = True):
+        self.ring_buffer = SharedMemoryRingBuffer(frame_shape, dtype=dtype, number_of_slots=number_of_slots)
+        self.copy = copy
+
+    def encode(self, frame: np.ndarray) -> List:
+        return [SHARED_MEMORY_HANDLE.pack(*self.ring_buffer.write(frame))]
+
+    def decode(self, message: memoryview) -> np.ndarray:
+        slot, sequence_number = SHARED_MEMORY_HANDLE.unpack(message)
+        return self.ring_buffer.read(slot, sequence_number, copy=self.copy)
+
+    def close(self):
+        self.ring_buffer.close()
+
+
+class DeltaFrameTransport:
+    """
+    Sends only the tiles of the frame that have changed since the last frame that was sent. The application process
+    compares each frame with the previous one, and the environment process applies the changed tiles to its copy of
+    the previous frame. If nothing has changed, an empty message is sent, and if most of the frame has changed, the
+    whole frame.
+
+    Both processes keep their own last frame in their copy of this object. With copy=False the decoded observation is
+    the reconstructed frame itself, which is updated in place by the next observation.
+    """
+
+    def __init__(self, frame_shape: Tuple[int, ...], dtype=np.uint8, tile_size: int = 16, copy: bool = True):
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.tile_size = tile_size
+        self.copy = copy
+
+        # The last frame that has been sent (application process) respectively received (environment process)
+        self.last_frame: np.ndarray = None
+
+        self.tile_rows = np.arange(0, self.frame_shape[0], tile_size)
+        self.tile_columns = np.arange(0, self.frame_shape[1], tile_size)
+
+    def _get_changed_tiles(self, frame: np.ndarray) -> np.ndarray:
+        changed_pixels = frame != self.last_frame
+        if changed_pixels.ndim > 2:
+            changed_pixels = changed_pixels.any(axis=tuple(range(2, changed_pixels.ndim)))
+
+        # Boolean array with one entry per tile, the tiles at the right and bottom border can be smaller
+        changed_tiles = np.logical_or.reduceat(changed_pixels, self.tile_rows, axis=0)
+        return np.logical_or.reduceat(changed_tiles, self.tile_columns, axis=1)
+
+    def encode(self, frame: np.ndarray) -> List:
+        if self.last_frame is None:
+            self.last_frame = frame.copy()
+            return [DELTA_FULL_FRAME, self.last_frame]
+
+        changed_tiles = self._get_changed_tiles(frame)
+
+        if not changed_tiles.any():
+            return []
+
+        if changed_tiles.mean() > DELTA_FULL_FRAME_THRESHOLD:
+            np.copyto(self.last_frame, frame)
+            return [DELTA_FULL_FRAME, self.last_frame]
+
+        message = [DELTA_TILES]
+        for row, column in zip(*np.nonzero(changed_tiles)):
+            y = int(row) * self.tile_size
+            x = int(column) * self.tile_size
+
+            tile = frame[y:y + self.tile_size, x:x + self.tile_size]
+            self.last_frame[y:y + self.tile_size, x:x + self.tile_size] = tile
+            message.append(DELTA_TILE_HEADER.pack(y, x, tile.shape[0], tile.shape[1]))
+            message.append(tile.tobytes())
+
+        return message
+
+    def decode(self, message: memoryview) -> np.ndarray:
+        if message[:1] == DELTA_FULL_FRAME:
+            if self.last_frame is None:
+                self.last_frame = np.empty(self.frame_shape, dtype=self.dtype)
+            self.last_frame[...] = np.frombuffer(message[1:], dtype=self.dtype).reshape(self.frame_shape)
+        elif message[:1] == DELTA_TILES:
+            pixel_size = self.dtype.itemsize * int(np.prod(self.frame_shape[2:]))
+
+            offset = 1
+            while offset < len(message):
+                y, x, height, width = DELTA_TILE_HEADER.unpack_from(message, offset)
+                offset += DELTA_TILE_HEADER.size
+
+                tile_size = height * width * pixel_size
+                tile = np.frombuffer(message[offset:offset + tile_size], dtype=self.dtype)
+                self.last_frame[y:y + height, x:x + width] = tile.reshape((height, width) + self.frame_shape[2:])
+                offset += tile_size
+
+        if self.copy:
+            return self.last_frame.copy()
+
+        return self.last_frame
+
+    def close(self):
+        pass
+
+
+def create_frame_transport(observation_transport: str, frame_shape: Tuple[int, ...], dtype=np.uint8,
+                           copy: bool = True):
+    if observation_transport == "pipe":
+        return PipeFrameTransport(frame_shape, dtype=dtype)
+    elif observation_transport == "shared_memory":
+        return SharedMemoryFrameTransport(frame_shape, dtype=dtype, copy=copy)
+    elif observation_transport == "delta":
+        return DeltaFrameTransport(frame_shape, dtype=dtype, copy=copy)
+
+    raise ValueError(f"Unknown observation transport '{observation_transport}', choose from {OBSERVATION_TRANSPORTS}")
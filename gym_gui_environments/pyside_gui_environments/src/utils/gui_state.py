@@ -0,0 +1,122 @@
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+from gym import spaces
+
+from gym_gui_environments.pyside_gui_environments.src.backend.calculator import NUMERAL_SYSTEMS
+from gym_gui_environments.pyside_gui_environments.src.backend.car_configurator import (CAR_MODELS, INTERIOR_VARIANTS,
+                                                                                       PROPULSION_SYSTEMS,
+                                                                                       TIRE_VARIANTS)
+from gym_gui_environments.pyside_gui_environments.src.backend.text_printer import FONTS
+from gym_gui_environments.pyside_gui_environments.src.settings_dialog import SettingsDialog
+from gym_gui_environments.pyside_gui_environments.src.utils.alert_dialogs import (ConfirmationDialog,
+                                                                                  MissingContentDialog, WarningDialog)
+from gym_gui_environments.pyside_gui_environments.src.utils.utils import get_active_modal_widget
+
+# Colors in the order of the radio buttons in the settings dialog
+TEXT_COLORS = ["red", "green", "blue", "black"]
+FIGURE_COLORS = ["green", "blue", "black", "brown"]
+
+# The open modal dialog is encoded as its index in this list plus 1, 0 means that no dialog is open
+MODAL_DIALOGS = [SettingsDialog, WarningDialog, MissingContentDialog, ConfirmationDialog]
+
+
+def _index(value, values: Sequence) -> int:
+    # Categorical values are encoded as their index, -1 if nothing is selected
+    return values.index(value) if value in values else -1
+
+
+def _get_open_modal_dialog(main_window) -> int:
+    modal_dialog = get_active_modal_widget(main_window)
+
+    for i, dialog_class in enumerate(MODAL_DIALOGS):
+        if isinstance(modal_dialog, dialog_class):
+            return i + 1
+
+    return 0
+
+
+def _combobox_index(name: str) -> Callable:
+    return lambda main_window: getattr(main_window.main_window, name).currentIndex()
+
+
+STATE_FEATURES: List[Tuple[str, Callable]] = [
+    # Main window
+    ("page", lambda main_window: main_window.main_window.main_stacked_widget.currentIndex()),
+    ("figure_printer_available", lambda main_window: main_window.main_window.figure_printer_button.isVisible()),
+    ("open_modal_dialog", _get_open_modal_dialog),
+    ("open_combobox", lambda main_window: main_window.open_combobox is not None),
+    ("settings_tab", lambda main_window: main_window.settings_dialog.settings_dialog.settings_tab.currentIndex()),
+    ("first_operand", _combobox_index("first_operand_combobox")),
+    ("math_operator", _combobox_index("math_operator_combobox")),
+    ("second_operand", _combobox_index("second_operand_combobox")),
+    ("car_model_selection", _combobox_index("car_model_selection_combobox")),
+    ("tire_selection", _combobox_index("tire_selection_combobox")),
+    ("interior_design", _combobox_index("interior_design_combobox")),
+    ("propulsion_system", _combobox_index("propulsion_system_combobox")),
+    ("figure", _combobox_index("figure_combobox")),
+    # Text Printer
+    ("word_count", lambda main_window: main_window.text_printer.word_count),
+    ("font_size", lambda main_window: main_window.text_printer.font_size),
+    ("font_name", lambda main_window: _index(main_window.text_printer.font_name, FONTS)),
+    ("font_color", lambda main_window: _index(main_window.text_printer.font_color, TEXT_COLORS)),
+    ("bold_font", lambda main_window: main_window.text_printer.bold_font),
+    ("italic_font", lambda main_window: main_window.text_printer.italic_font),
+    ("underline_font", lambda main_window: main_window.text_printer.underline_font),
+    # Calculator
+    ("numeral_system", lambda main_window: _index(main_window.calculator.numeral_system, NUMERAL_SYSTEMS)),
+    ("addition_operator", lambda main_window: main_window.calculator.addition_operator),
+    ("subtraction_operator", lambda main_window: main_window.calculator.subtraction_operator),
+    ("multiplication_operator", lambda main_window: main_window.calculator.multiplication_operator),
+    ("division_operator", lambda main_window: main_window.calculator.division_operator),
+    # Car Configurator
+    ("car_a", lambda main_window: main_window.car_configurator.car_a),
+    ("car_b", lambda main_window: main_window.car_configurator.car_b),
+    ("car_c", lambda main_window: main_window.car_configurator.car_c),
+    ("tire_18_inch", lambda main_window: main_window.car_configurator.tire_18_inch),
+    ("tire_19_inch", lambda main_window: main_window.car_configurator.tire_19_inch),
+    ("tire_20_inch", lambda main_window: main_window.car_configurator.tire_20_inch),
+    ("tire_22_inch", lambda main_window: main_window.car_configurator.tire_22_inch),
+    ("modern_interior", lambda main_window: main_window.car_configurator.modern_interior),
+    ("vintage_interior", lambda main_window: main_window.car_configurator.vintage_interior),
+    ("sport_interior", lambda main_window: main_window.car_configurator.sport_interior),
+    ("combustion_engine_a", lambda main_window: main_window.car_configurator.combustion_engine_a),
+    ("combustion_engine_b", lambda main_window: main_window.car_configurator.combustion_engine_b),
+    ("combustion_engine_c", lambda main_window: main_window.car_configurator.combustion_engine_c),
+    ("electric_motor_a", lambda main_window: main_window.car_configurator.electric_motor_a),
+    ("electric_motor_b", lambda main_window: main_window.car_configurator.electric_motor_b),
+    ("selected_car", lambda main_window: _index(main_window.car_configurator.selected_car, CAR_MODELS)),
+    ("selected_tire", lambda main_window: _index(main_window.car_configurator.selected_tire, TIRE_VARIANTS)),
+    ("selected_interior",
+     lambda main_window: _index(main_window.car_configurator.selected_interior, INTERIOR_VARIANTS)),
+    ("selected_propulsion_system",
+     lambda main_window: _index(main_window.car_configurator.selected_propulsion_system, PROPULSION_SYSTEMS)),
+    # Figure Printer
+    ("christmas_tree", lambda main_window: main_window.figure_printer.christmas_tree),
+    ("guitar", lambda main_window: main_window.figure_printer.guitar),
+    ("space_ship", lambda main_window: main_window.figure_printer.space_ship),
+    ("house", lambda main_window: main_window.figure_printer.house),
+    ("figure_color", lambda main_window: _index(main_window.figure_printer.color, FIGURE_COLORS)),
+]
+
+STATE_FEATURE_NAMES = [name for name, _ in STATE_FEATURES]
+
+
+def get_gui_state_space() -> spaces.Box:
+    # Booleans are 0 or 1, indices are -1 if nothing is selected, the word count and font size are used as they are
+    return spaces.Box(low=-1, high=np.inf, shape=(len(STATE_FEATURES),), dtype=np.float32)
+
+
+def get_gui_state(main_window, out: np.ndarray = None) -> np.ndarray:
+    """
+    Returns the logical state of the application as a vector with the layout of STATE_FEATURES: the shown page, the
+    selected entries of the combo boxes, the open dialog and the settings of the backends. It is read from the widgets
+    and backends directly, so no screenshot is needed.
+    """
+    if out is None:
+        out = np.zeros(len(STATE_FEATURES), dtype=np.float32)
+
+    for i, (_, get_feature) in enumerate(STATE_FEATURES):
+        out[i] = get_feature(main_window)
+
+    return out
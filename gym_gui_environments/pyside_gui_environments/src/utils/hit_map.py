@@ -0,0 +1,117 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PySide6.QtCore import QEvent, QObject, QPoint, Qt
+from PySide6.QtWidgets import QWidget
+
+from gym_gui_environments.pyside_gui_environments.src.utils.widget_renderer import get_visible_windows
+
+# Events after which a widget can be found at other positions than before
+INVALIDATING_EVENTS = {QEvent.Show, QEvent.Hide, QEvent.Move, QEvent.Resize, QEvent.ZOrderChange, QEvent.ParentChange}
+
+
+class HitMap(QObject):
+    """
+    Caches which widget receives a click at each pixel of the main window, so clicks do not have to search the widget
+    hierarchy with QApplication.widgetAt().
+
+    The map is an array with the size of the main window that contains a widget ID per pixel, ID 0 means that there is
+    no widget. It is built by drawing the rectangles of all visible widgets (clipped to their parents) in stacking
+    order, starting with the main window, then the dialogs and last the popups, i.e. in the same order as
+    QApplication.widgetAt() searches them, only reversed.
+
+    The map is installed as an event filter on the application and marked as invalid as soon as any widget is shown,
+    hidden, moved, resized or raised. This covers new pages of stacked widgets, dialogs and opened or closed combo
+    boxes. It is only rebuilt when it is used the next time.
+    """
+
+    def __init__(self, main_window: QWidget, **kwargs):
+        super().__init__(**kwargs)
+        self.main_window = main_window
+
+        size = main_window.window().size()
+        self.widget_ids = np.zeros((size.height(), size.width()), dtype=np.int32)
+
+        # Indexed by the widget ID, the origin is the position of the widget relative to the main window
+        self.widgets: List[Optional[QWidget]] = [None]
+        self.widget_origins: List[Tuple[int, int]] = [(0, 0)]
+
+        self.valid = False
+
+        # Incremented every time the map is rebuilt, so derived tables know when they are outdated
+        self.version = 0
+
+    def eventFilter(self, obj: QObject, event: QEvent):
+        if event.type() in INVALIDATING_EVENTS:
+            self.valid = False
+
+        return False
+
+    def invalidate(self):
+        self.valid = False
+
+    def _add_widget(self, widget: QWidget, x: int, y: int, clip: Tuple[int, int, int, int]):
+        # Visible part of the widget, x and y are relative to the main window
+        left = max(x, clip[0])
+        top = max(y, clip[1])
+        right = min(x + widget.width(), clip[2])
+        bottom = min(y + widget.height(), clip[3])
+
+        if left >= right or top >= bottom:
+            return
+
+        widget_id = len(self.widgets)
+        self.widgets.append(widget)
+        self.widget_origins.append((x, y))
+
+        self.widget_ids[top:bottom, left:right] = widget_id
+
+        # Children are stored in stacking order, so later children are drawn on top of earlier ones
+        for child in widget.children():
+            if not isinstance(child, QWidget) or child.isWindow() or not child.isVisible():
+                continue
+
+            if child.testAttribute(Qt.WA_TransparentForMouseEvents):
+                # Clicks go through such widgets and their children
+                continue
+
+            self._add_widget(child, x + child.x(), y + child.y(), (left, top, right, bottom))
+
+    def update(self):
+        if self.valid:
+            return
+
+        self.widget_ids.fill(0)
+        self.widgets = [None]
+        self.widget_origins = [(0, 0)]
+
+        origin = self.main_window.window().mapToGlobal(QPoint(0, 0))
+        height, width = self.widget_ids.shape
+
+        for window in get_visible_windows(self.main_window):
+            position = window.mapToGlobal(QPoint(0, 0)) - origin
+            self._add_widget(window, position.x(), position.y(), (0, 0, width, height))
+
+        self.valid = True
+        self.version += 1
+
+    def widget_at(self, x: int, y: int) -> Tuple[Optional[QWidget], QPoint]:
+        """
+        Returns the widget at the position (relative to the main window) and the position relative to this widget.
+        """
+        self.update()
+
+        widget_id = self.widget_ids[y, x]
+        origin_x, origin_y = self.widget_origins[widget_id]
+
+        return self.widgets[widget_id], QPoint(x - origin_x, y - origin_y)
+
+    def export(self) -> Tuple[np.ndarray, List[str]]:
+        """
+        Returns a copy of the widget ID array and the object names of the widgets, indexed by their ID (an empty name
+        for ID 0). The IDs are only valid until the map is rebuilt.
+        """
+        self.update()
+
+        names = [""] + [widget.objectName() or widget.metaObject().className() for widget in self.widgets[1:]]
+        return self.widget_ids.copy(), names
@@ -0,0 +1,46 @@
+import logging
+import multiprocessing as mp
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import coverage.exceptions
+from coverage import Coverage
+
+# Number of processes that render the HTML reports in the background, shared by all environments of a process
+HTML_REPORT_WORKERS = 2
+
+# Path of the coverage configuration file, the lines that were covered per file and the directory of the report
+HtmlReportRequest = Tuple[str, Dict[str, List[int]], str]
+
+_executor: ProcessPoolExecutor = None
+
+
+def render_html_report(coveragerc_file_path: str, covered_lines: Dict[str, List[int]], directory: str) -> str:
+    """
+    Renders the HTML report of the covered lines into the directory and returns the directory. Does not need the
+    application, only the source files of the measured modules.
+    """
+    coverage_measurer = Coverage(data_file=None, config_file=coveragerc_file_path)
+    coverage_measurer.get_data().add_lines(covered_lines)
+
+    try:
+        coverage_measurer.html_report(directory=directory, precision=4)
+    except coverage.exceptions.CoverageException:
+        logging.debug("Did not create an HTML report because nothing was measured")
+
+    return directory
+
+
+def submit_html_report(html_report_request: HtmlReportRequest) -> Future:
+    """
+    Renders the report in a background process, the returned future has the directory of the report as its result.
+    The processes are started on the first call and keep running until the interpreter exits, which waits for the
+    reports that are still being rendered.
+    """
+    global _executor
+
+    if _executor is None:
+        # Spawned, so the workers do not inherit any Qt or pipe state of this process
+        _executor = ProcessPoolExecutor(max_workers=HTML_REPORT_WORKERS, mp_context=mp.get_context("spawn"))
+
+    return _executor.submit(render_html_report, *html_report_request)
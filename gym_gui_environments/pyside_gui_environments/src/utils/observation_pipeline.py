@@ -0,0 +1,116 @@
+from typing import Tuple
+
+import numpy as np
+from gym import spaces
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage
+
+from gym_gui_environments.pyside_gui_environments.src.utils.utils import get_image_view
+
+OUTPUT_DTYPES = ["uint8", "float16"]
+
+
+class ObservationPipeline:
+    """
+    Preprocesses the screenshots in the application process, before they are sent to the environment.
+
+    The steps are applied in this order, each of them is optional:
+      - crop: (top, left, height, width) region of the screenshot
+      - resize: (height, width) of the resized screenshot, scaled with bilinear filtering
+      - grayscale: converts the BGR screenshot to a single channel, with the weights of qGray()
+      - dtype: "uint8" keeps the values in [0, 255], "float16" scales them to [0, 1]
+      - frame_stack: number of consecutive frames that are concatenated along the channel axis, the oldest first
+
+    The observations always have the shape (height, width, channels * frame_stack), with 1 or 3 channels. At the start
+    of an episode, the frame stack is filled with the first frame.
+    """
+
+    def __init__(self, input_shape: Tuple[int, int, int], crop: Tuple[int, int, int, int] = None,
+                 resize: Tuple[int, int] = None, grayscale: bool = False, dtype: str = "uint8", frame_stack: int = 1):
+        if dtype not in OUTPUT_DTYPES:
+            raise ValueError(f"Unknown observation dtype '{dtype}', choose from {OUTPUT_DTYPES}")
+
+        if frame_stack < 1:
+            raise ValueError(f"frame_stack must be at least 1, got {frame_stack}")
+
+        input_height, input_width, _ = input_shape
+
+        if crop is not None:
+            top, left, height, width = crop
+            if top < 0 or left < 0 or height < 1 or width < 1 or top + height > input_height or \
+                    left + width > input_width:
+                raise ValueError(f"Crop {crop} is outside of the screenshot of shape {input_shape}")
+        else:
+            height, width = input_height, input_width
+
+        if resize is not None:
+            height, width = resize
+
+        self.input_shape = input_shape
+        self.crop = crop
+        self.resize = resize
+        self.grayscale = grayscale
+        self.dtype = np.dtype(dtype)
+        self.frame_stack = frame_stack
+
+        self.channels = 1 if grayscale else 3
+        self.frame_shape = (height, width, self.channels)
+        self.shape = (height, width, self.channels * frame_stack)
+
+        # Reused for every observation, the frame transport sends or copies it right away
+        self.observation = np.zeros(self.shape, dtype=self.dtype)
+        self.frames_in_stack = 0
+
+        self.transformed_image: QImage = None
+
+    @property
+    def observation_space(self) -> spaces.Box:
+        high = 1.0 if self.dtype == np.float16 else 255
+        return spaces.Box(low=0, high=high, shape=self.shape, dtype=self.dtype)
+
+    def _transform(self, screenshot: np.ndarray) -> np.ndarray:
+        if self.crop is None and self.resize is None and not self.grayscale:
+            return screenshot
+
+        height, width, _ = screenshot.shape
+        image = QImage(screenshot.data, width, height, screenshot.strides[0], QImage.Format_BGR888)
+
+        if self.crop is not None:
+            top, left, crop_height, crop_width = self.crop
+            image = image.copy(left, top, crop_width, crop_height)
+
+        if self.resize is not None:
+            image = image.scaled(self.resize[1], self.resize[0], Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+        # The view does not keep the image alive, so it is kept until the next frame has been transformed
+        self.transformed_image = image.convertToFormat(
+            QImage.Format_Grayscale8 if self.grayscale else QImage.Format_BGR888
+        )
+
+        return get_image_view(self.transformed_image, self.channels)
+
+    def process(self, screenshot: np.ndarray, first_frame: bool = False) -> np.ndarray:
+        """
+        Returns the observation for the screenshot. The returned array is overwritten by the next call. first_frame
+        starts a new episode, i.e. the frames of the previous episode are removed from the frame stack.
+        """
+        frame = self._transform(screenshot)
+
+        if first_frame or self.frames_in_stack == 0:
+            stack_shape = self.frame_shape[:2] + (self.frame_stack, self.channels)
+            frames = np.broadcast_to(frame[:, :, np.newaxis, :], stack_shape)
+            self._copy(self.observation, frames.reshape(self.shape))
+            self.frames_in_stack = self.frame_stack
+            return self.observation
+
+        # Drops the oldest frame, numpy handles the overlap of source and destination
+        self.observation[:, :, :-self.channels] = self.observation[:, :, self.channels:]
+        self._copy(self.observation[:, :, -self.channels:], frame)
+
+        return self.observation
+
+    def _copy(self, destination: np.ndarray, frame: np.ndarray):
+        if self.dtype == np.float16:
+            np.multiply(frame, 1 / 255, out=destination, casting="unsafe")
+        else:
+            np.copyto(destination, frame)
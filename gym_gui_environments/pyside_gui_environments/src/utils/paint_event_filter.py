@@ -7,11 +7,16 @@ class PaintEventFilter(QObject):
         super().__init__(**kwargs)
 
         self.last_paint_event_timer = QElapsedTimer()
+        self.paint_event_count = 0
+
+        # Set while the observation is rendered with QWidget.render(), these paint events are not counted
+        self.paused = False
 
     def eventFilter(self, obj: QObject, event: QEvent):
-        if event.type() == QEvent.Paint:
+        if event.type() == QEvent.Paint and not self.paused:
             # Paint event occurred, restart the timer
             self.last_paint_event_timer.restart()
+            self.paint_event_count += 1
 
         # Always return false, indicating that we did not handle the event. We only want to know when the last paint
         # event occurred
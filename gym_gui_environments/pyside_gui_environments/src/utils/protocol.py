@@ -0,0 +1,168 @@
+import pickle
+import struct
+import threading
+from multiprocessing import BufferTooShort
+from multiprocessing.connection import Connection
+from typing import List, NamedTuple, Sequence, Tuple, Union
+
+# Requests of the environment, the request header is followed by the packed clicks of a macro action
+REQUEST_STEP = 1
+REQUEST_RESET = 2
+REQUEST_TERMINATE = 3
+
+# Kinds of a click, the coordinates are only used for CLICK_COORDINATES
+CLICK_COORDINATES = 0
+CLICK_RANDOM_WIDGET = 1
+CLICK_MACRO = 2
+
+# Responses of the application process, the response header is followed by the extras and the encoded observation
+RESPONSE_STEP = 1
+RESPONSE_OBSERVATION = 2
+RESPONSE_TERMINATED = 3
+
+# Request type, click kind, x, y
+REQUEST_HEADER = struct.Struct("<BBii")
+
+# Click kind, x, y of each click of a macro action
+MACRO_CLICK = struct.Struct("<Bii")
+
+# Response type, reward, x, y and increased delay of the (last) click, length of the extras
+RESPONSE_HEADER = struct.Struct("<BdiiBI")
+
+# Click result of responses that do not belong to a click: reward, x, y, increased delay
+NO_CLICK_RESULT = (0.0, 0, 0, False)
+
+# Initial size of the receive and send buffers, they grow to the size of the largest message
+INITIAL_BUFFER_SIZE = 1 << 16
+
+Click = Union[Tuple[int, int], bool]
+Action = Union[Click, List[Click]]
+
+
+class Response(NamedTuple):
+    response_type: int
+    reward: float
+    x: int
+    y: int
+    increased_delay: bool
+    # Optional entries that are not needed for every step, e.g. the action mask or the results of a macro action
+    extras: dict
+    # Encoded observation, a view into the receive buffer that is only valid until the next message is received
+    payload: memoryview
+
+
+def _pack_click(click: Click) -> Tuple[int, int, int]:
+    if isinstance(click, bool):
+        return CLICK_RANDOM_WIDGET, 0, 0
+
+    return CLICK_COORDINATES, int(click[0]), int(click[1])
+
+
+def _unpack_click(kind: int, x: int, y: int) -> Click:
+    if kind == CLICK_RANDOM_WIDGET:
+        return True
+
+    return x, y
+
+
+class Channel:
+    """
+    One end of the duplex pipe between the environment and its application process. Every message is a single frame
+    that starts with a fixed struct-packed header, so a step needs exactly one request and one response and nothing on
+    this path is pickled: the request carries the action, the response the click result and the encoded observation.
+    Only the optional extras of a response (e.g. the action mask or the step timings) are pickled, and only if there
+    are any.
+
+    Messages are received into and sent from reused buffers. Sending is locked, because the initial observation of the
+    fixed settle mode is sent from the GUI thread instead of the click thread.
+    """
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.receive_buffer = bytearray(INITIAL_BUFFER_SIZE)
+        self.send_buffer = bytearray(INITIAL_BUFFER_SIZE)
+        self.send_lock = threading.Lock()
+
+    def fileno(self) -> int:
+        return self.connection.fileno()
+
+    def _send(self, parts: Sequence):
+        with self.send_lock:
+            if len(parts) == 1:
+                # Requests and responses without an observation are sent as they are
+                self.connection.send_bytes(parts[0])
+                return
+
+            parts = [memoryview(part).cast("B") for part in parts]
+            size = sum(part.nbytes for part in parts)
+
+            if size > len(self.send_buffer):
+                self.send_buffer = bytearray(size)
+
+            offset = 0
+            for part in parts:
+                self.send_buffer[offset:offset + part.nbytes] = part
+                offset += part.nbytes
+
+            self.connection.send_bytes(self.send_buffer, 0, size)
+
+    def _receive(self) -> memoryview:
+        try:
+            size = self.connection.recv_bytes_into(self.receive_buffer)
+        except BufferTooShort as e:
+            # The whole message is attached to the exception, the buffer is enlarged for the next messages of this size
+            message = e.args[0]
+            self.receive_buffer = bytearray(message)
+            size = len(message)
+
+        return memoryview(self.receive_buffer)[:size]
+
+    def send_step(self, action: Action):
+        if isinstance(action, list):
+            clicks = [MACRO_CLICK.pack(*_pack_click(click)) for click in action]
+            self._send([REQUEST_HEADER.pack(REQUEST_STEP, CLICK_MACRO, 0, 0), *clicks])
+        else:
+            self._send([REQUEST_HEADER.pack(REQUEST_STEP, *_pack_click(action))])
+
+    def send_reset(self):
+        self._send([REQUEST_HEADER.pack(REQUEST_RESET, CLICK_COORDINATES, 0, 0)])
+
+    def send_terminate(self):
+        self._send([REQUEST_HEADER.pack(REQUEST_TERMINATE, CLICK_COORDINATES, 0, 0)])
+
+    def receive_request(self) -> Tuple[int, Action]:
+        message = self._receive()
+        request_type, kind, x, y = REQUEST_HEADER.unpack_from(message)
+
+        if kind == CLICK_MACRO:
+            action = [_unpack_click(*click) for click in MACRO_CLICK.iter_unpack(message[REQUEST_HEADER.size:])]
+        else:
+            action = _unpack_click(kind, x, y)
+
+        return request_type, action
+
+    def send_response(self, response_type: int, click_result: Tuple[float, int, int, bool] = NO_CLICK_RESULT,
+                      extras: dict = None, payload: Sequence = ()):
+        """
+        Sends the click result, the extras (if not empty) and the parts of the encoded observation, which are written
+        into the send buffer one after another without being concatenated first.
+        """
+        pickled_extras = pickle.dumps(extras, protocol=pickle.HIGHEST_PROTOCOL) if extras else b""
+
+        reward, x, y, increased_delay = click_result
+        header = RESPONSE_HEADER.pack(response_type, reward, x, y, increased_delay, len(pickled_extras))
+
+        if pickled_extras:
+            self._send([header, pickled_extras, *payload])
+        else:
+            self._send([header, *payload])
+
+    def receive_response(self) -> Response:
+        message = self._receive()
+        response_type, reward, x, y, increased_delay, extras_size = RESPONSE_HEADER.unpack_from(message)
+
+        offset = RESPONSE_HEADER.size
+        extras = pickle.loads(message[offset:offset + extras_size]) if extras_size > 0 else {}
+
+        return Response(response_type, reward, x, y, bool(increased_delay), extras,
+                        message[offset + extras_size:])
@@ -0,0 +1,99 @@
+import threading
+
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer, Slot
+from PySide6.QtWidgets import QApplication
+
+from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
+
+# Widgets that Qt creates for the duration of a combo box or menu animation (Qt::UI_AnimateCombo, Qt::UI_FadeMenu, ...)
+ANIMATION_EFFECT_WIDGETS = ["QRollEffect", "QAlphaWidget"]
+
+# Number of consecutive idle event loop iterations without a paint event, after which the GUI counts as settled
+REQUIRED_QUIET_PROBES = 2
+
+
+class SettleDetector(QObject):
+    """
+    Detects when the GUI has settled after a click, i.e. when nothing is painted anymore.
+
+    Lives in the GUI thread and is started from the click thread with start(). It then probes the GUI thread with a
+    zero timeout timer, which only fires after the GUI thread has processed all pending events. The GUI counts as
+    settled if no paint event happened in between several of these probes, all visible windows have been exposed and
+    no combo box or menu animation is running. The timeout passed to start() is an upper bound, after which the GUI
+    counts as settled regardless.
+
+    The click thread waits on the settled event, which is set from the GUI thread.
+    """
+
+    def __init__(self, paint_event_filter: PaintEventFilter, **kwargs):
+        super().__init__(**kwargs)
+        self.paint_event_filter = paint_event_filter
+
+        self.settled = threading.Event()
+        self.settled.set()
+
+        self.settle_timer = QElapsedTimer()
+        self.timeout = 0
+
+        self.last_paint_event_count = 0
+        self.quiet_probes = 0
+
+        self.probe_timer = QTimer(self)
+        self.probe_timer.setInterval(0)
+        self.probe_timer.timeout.connect(self._probe)
+
+    @Slot(int)
+    def start(self, timeout: int):
+        # Clearing the settled event is done by the click thread before it emits the signal that calls this slot,
+        # otherwise it could wait on the event of the last step
+        self.timeout = timeout
+        self.last_paint_event_count = self.paint_event_filter.paint_event_count
+        self.quiet_probes = 0
+
+        self.settle_timer.start()
+        self.probe_timer.start()
+
+    def wait(self, timeout: int) -> bool:
+        # Called from the click thread, the additional second covers a GUI thread that is too busy to notice the timeout
+        return self.settled.wait(timeout / 1000 + 1)
+
+    @staticmethod
+    def _animation_is_running() -> bool:
+        for widget in QApplication.topLevelWidgets():
+            if widget.isVisible() and widget.metaObject().className() in ANIMATION_EFFECT_WIDGETS:
+                return True
+        return False
+
+    @staticmethod
+    def _expose_is_pending() -> bool:
+        # Newly shown windows (dialogs, combo box popups) are painted only after the window system exposed them
+        for widget in QApplication.topLevelWidgets():
+            if widget.isVisible() and widget.windowHandle() is not None and not widget.windowHandle().isExposed():
+                return True
+        return False
+
+    @Slot()
+    def _probe(self):
+        if self.settle_timer.hasExpired(self.timeout):
+            self._finish()
+            return
+
+        paint_event_count = self.paint_event_filter.paint_event_count
+
+        if paint_event_count != self.last_paint_event_count:
+            self.last_paint_event_count = paint_event_count
+            self.quiet_probes = 0
+            return
+
+        if self._animation_is_running() or self._expose_is_pending():
+            self.quiet_probes = 0
+            return
+
+        self.quiet_probes += 1
+
+        if self.quiet_probes >= REQUIRED_QUIET_PROBES:
+            self._finish()
+
+    def _finish(self):
+        self.probe_timer.stop()
+        self.settled.set()
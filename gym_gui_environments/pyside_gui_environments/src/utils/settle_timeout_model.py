@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import numpy as np
+from PySide6.QtCore import QElapsedTimer
+
+from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
+
+# Bounds of the learned budgets in milliseconds, the upper bound is well above the longest hard-coded delay, so slow
+# transitions can get more time than before
+MIN_SETTLE_BUDGET = 25
+MAX_SETTLE_BUDGET = 1000
+
+# Added to the percentile of the measured paint durations, the GUI has to be quiet for some time to count as settled
+SETTLE_BUDGET_MARGIN = 25
+
+# A budget is only learned for a click type after this many measurements, until then the hard-coded delays are used
+MIN_SETTLE_SAMPLES = 10
+
+# Number of the last measurements per click type that are kept
+SETTLE_DURATIONS_WINDOW = 200
+
+
+def add_settle_durations(durations: Dict[str, Deque[int]], new_durations: Dict[str, List[int]],
+                         window: int = SETTLE_DURATIONS_WINDOW):
+    # Appends the new paint durations per click type, only the last window durations of each type are kept
+    for click_type, click_type_durations in new_durations.items():
+        if click_type not in durations:
+            durations[click_type] = deque(maxlen=window)
+
+        durations[click_type].extend(click_type_durations)
+
+
+def load_settle_durations(file_path: str, window: int = SETTLE_DURATIONS_WINDOW) -> Dict[str, Deque[int]]:
+    durations = {}
+
+    if os.path.exists(file_path):
+        with open(file_path, "r") as f:
+            add_settle_durations(durations, json.load(f), window)
+
+    return durations
+
+
+def save_settle_durations(file_path: str, durations: Dict[str, Deque[int]]):
+    # Written to a temporary file in the same directory first, so environments that share the file never read a
+    # partially written one. The file of the environment that saves last wins.
+    directory = os.path.dirname(os.path.abspath(file_path))
+    file_descriptor, temporary_file_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+    try:
+        with os.fdopen(file_descriptor, "w") as f:
+            json.dump({click_type: list(durations_of_type) for click_type, durations_of_type in durations.items()}, f)
+        os.replace(temporary_file_path, file_path)
+    except BaseException:
+        os.remove(temporary_file_path)
+        raise
+
+
+class SettleTimeoutModel:
+    """
+    Learns how long the GUI keeps painting after a click, separately for each click type, i.e. the class of the clicked
+    widget and the transition the click caused (e.g. an opened combo box or a newly opened dialog). The wait budget of a
+    click type is a high percentile of its measured paint durations plus a margin, so clicks on widgets that are
+    repainted quickly get short waits and slow transitions get long enough waits to be painted completely.
+
+    The main window calls start() right after each click, the click thread asks for the budget with get_budget() before
+    it waits and calls finish() after waiting, which records the time from the click until the last paint event. The
+    measurements of the last window clicks per click type are kept. The model lives in the application process, so the
+    environment passes the measurements of the previous application processes to it and collects the new ones with
+    pop_new_durations() when the process is stopped.
+    """
+
+    def __init__(self, paint_event_filter: PaintEventFilter, percentile: float = 95,
+                 window: int = SETTLE_DURATIONS_WINDOW, durations: Dict[str, List[int]] = None):
+        self.paint_event_filter = paint_event_filter
+        self.percentile = percentile
+        self.window = window
+
+        # Paint durations in milliseconds per click type
+        self.durations: Dict[str, Deque[int]] = {}
+        add_settle_durations(self.durations, durations or {}, window)
+
+        # Durations that have been measured since the last pop_new_durations(), also only the last window per click type
+        self.new_durations: Dict[str, Deque[int]] = {}
+
+        # Click type of the click whose paint duration is currently measured
+        self.click_type: Optional[str] = None
+        self.click_timer = QElapsedTimer()
+        self.paint_event_count = 0
+
+    def start(self, widget_class: str, transition: str):
+        self.click_type = f"{widget_class}/{transition}"
+        self.paint_event_count = self.paint_event_filter.paint_event_count
+        self.click_timer.restart()
+
+    def get_budget(self) -> Optional[int]:
+        """
+        Returns the budget in milliseconds for the current click, or None if too few clicks of its type have been
+        measured yet.
+        """
+        if self.click_type is None:
+            return None
+
+        return self._get_budget_of(self.click_type)
+
+    def _get_budget_of(self, click_type: str) -> Optional[int]:
+        durations = self.durations.get(click_type)
+        if durations is None or len(durations) < MIN_SETTLE_SAMPLES:
+            return None
+
+        budget = np.percentile(durations, self.percentile) + SETTLE_BUDGET_MARGIN
+        return int(np.clip(budget, MIN_SETTLE_BUDGET, MAX_SETTLE_BUDGET))
+
+    def finish(self):
+        if self.click_type is None:
+            return
+
+        if self.paint_event_filter.paint_event_count != self.paint_event_count:
+            duration = self.click_timer.elapsed() - self.paint_event_filter.last_paint_event_timer.elapsed()
+        else:
+            # Nothing has been painted after the click
+            duration = 0
+
+        for durations in [self.durations, self.new_durations]:
+            add_settle_durations(durations, {self.click_type: [max(duration, 0)]}, self.window)
+
+        self.click_type = None
+
+    def pop_new_durations(self) -> Dict[str, List[int]]:
+        new_durations = {click_type: list(durations) for click_type, durations in self.new_durations.items()}
+        self.new_durations = {}
+        return new_durations
+
+    def get_budgets(self) -> Dict[str, Optional[int]]:
+        # Current budget of every click type, for logging
+        return {click_type: self._get_budget_of(click_type) for click_type in self.durations}
@@ -0,0 +1,95 @@
+import json
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Deque, Dict
+
+import numpy as np
+
+# Bin edges of the histograms in seconds, logarithmically spaced from 10 microseconds to 10 seconds
+HISTOGRAM_BIN_EDGES = np.logspace(-5, 1, 25)
+
+
+class PhaseTimer:
+    """
+    Records how long the phases of a step take, in seconds. If a phase occurs several times in a step (e.g. the clicks
+    of a macro action), the durations are added up. pop() returns the timings of the step and starts the next one.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def add(self, phase: str, duration: float):
+        self.timings[phase] = self.timings.get(phase, 0.0) + duration
+
+    def pop(self) -> Dict[str, float]:
+        timings = self.timings
+        self.timings = {}
+        return timings
+
+
+def measure(phase_timer: PhaseTimer, phase: str):
+    # Does nothing if no timer is set, so the timings can be switched off without changing the code that is measured
+    if phase_timer is None:
+        return nullcontext()
+
+    return phase_timer.measure(phase)
+
+
+class StepTimingStatistics:
+    """
+    Keeps the timings of the last window steps per phase, to summarize them with percentiles and histograms.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.timings: Dict[str, Deque[float]] = {}
+
+    def add(self, timings: Dict[str, float]):
+        for phase, duration in timings.items():
+            if phase not in self.timings:
+                self.timings[phase] = deque(maxlen=self.window)
+
+            self.timings[phase].append(duration)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+
+        for phase, durations in self.timings.items():
+            durations = np.array(durations)
+            p50, p90, p99 = np.percentile(durations, [50, 90, 99])
+
+            summary[phase] = {
+                "count": len(durations),
+                "mean": float(durations.mean()),
+                "p50": float(p50),
+                "p90": float(p90),
+                "p99": float(p99),
+                "max": float(durations.max())
+            }
+
+        return summary
+
+    def histograms(self) -> Dict[str, Dict[str, list]]:
+        histograms = {}
+
+        for phase, durations in self.timings.items():
+            # Durations outside the bins are counted in the first respectively last bin
+            clipped_durations = np.clip(durations, HISTOGRAM_BIN_EDGES[0], HISTOGRAM_BIN_EDGES[-1])
+            counts, _ = np.histogram(clipped_durations, bins=HISTOGRAM_BIN_EDGES)
+
+            histograms[phase] = {"bin_edges": HISTOGRAM_BIN_EDGES.tolist(), "counts": counts.tolist()}
+
+        return histograms
+
+    def dump(self, file_path: str):
+        with open(file_path, "w") as f:
+            json.dump({"summary": self.summary(), "histograms": self.histograms()}, f, indent=2)
@@ -0,0 +1,143 @@
+import fnmatch
+import importlib.util
+import logging
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, Set
+
+from coverage import Coverage
+
+TOOL_NAME = "gym_gui_environments"
+
+
+class SysMonitoringCoverage:
+    """
+    Line coverage collector built on sys.monitoring (Python 3.12+), with the parts of the Coverage interface that are
+    used by the MainWindow and the environment (start, stop, get_data, report, html_report, analysis2, erase).
+
+    LINE events are only enabled for code objects in the measured source files, and each line is disabled after its
+    first hit. Once the reachable code has been explored, repeated clicks on it are therefore almost free, whereas
+    coverage.py traces the whole callback tree on every click.
+
+    The collected lines are added to the data of a regular Coverage object, which uses the same configuration file and
+    is used for the reports.
+    """
+
+    def __init__(self, config_file: str):
+        self.coverage = Coverage(data_file=None, config_file=config_file)
+
+        self.source_directories = [self._get_source_directory(source) for source in self.coverage.config.source or []]
+        self.omit = self.coverage.config.run_omit or []
+
+        self.is_measured_cache: Dict[str, bool] = {}
+
+        # Lines that have not yet been added to the coverage data, respectively not yet been fetched with
+        # drain_new_lines(). A line can still be reported more than once, because disabling works per instruction and
+        # a line can consist of several of them.
+        self.unsynchronized_lines: Dict[str, Set[int]] = defaultdict(set)
+        self.new_lines: Dict[str, Set[int]] = defaultdict(set)
+
+        self.active = False
+        self.registered = False
+
+    @staticmethod
+    def _get_source_directory(source: str) -> str:
+        if os.path.isdir(source):
+            return os.path.realpath(source)
+
+        # Source is given as a package name
+        spec = importlib.util.find_spec(source)
+        return os.path.realpath(spec.submodule_search_locations[0])
+
+    def _is_measured(self, file_name: str) -> bool:
+        try:
+            return self.is_measured_cache[file_name]
+        except KeyError:
+            pass
+
+        is_measured = False
+        if file_name.endswith(".py"):
+            path = os.path.realpath(file_name)
+            in_source = any(path.startswith(directory + os.sep) for directory in self.source_directories)
+            is_measured = in_source and not any(fnmatch.fnmatch(path, pattern) for pattern in self.omit)
+
+        self.is_measured_cache[file_name] = is_measured
+        return is_measured
+
+    def _on_py_start(self, code, instruction_offset):
+        if self._is_measured(code.co_filename):
+            sys.monitoring.set_local_events(sys.monitoring.COVERAGE_ID, code, sys.monitoring.events.LINE)
+
+        # Every code object has to be checked only once
+        return sys.monitoring.DISABLE
+
+    def _on_line(self, code, line_number):
+        if not self.active:
+            # Lines executed outside start() and stop() are not counted, but they must stay enabled to be counted later
+            return None
+
+        file_name = os.path.realpath(code.co_filename)
+        self.unsynchronized_lines[file_name].add(line_number)
+        self.new_lines[file_name].add(line_number)
+
+        return sys.monitoring.DISABLE
+
+    def start(self):
+        if not self.registered:
+            sys.monitoring.use_tool_id(sys.monitoring.COVERAGE_ID, TOOL_NAME)
+            sys.monitoring.register_callback(sys.monitoring.COVERAGE_ID, sys.monitoring.events.PY_START,
+                                             self._on_py_start)
+            sys.monitoring.register_callback(sys.monitoring.COVERAGE_ID, sys.monitoring.events.LINE, self._on_line)
+            self.registered = True
+
+        self.active = True
+        sys.monitoring.set_events(sys.monitoring.COVERAGE_ID, sys.monitoring.events.PY_START)
+
+    def stop(self):
+        self.active = False
+        sys.monitoring.set_events(sys.monitoring.COVERAGE_ID, 0)
+
+    def drain_new_lines(self) -> Dict[str, Set[int]]:
+        new_lines = self.new_lines
+        self.new_lines = defaultdict(set)
+        return new_lines
+
+    def get_data(self):
+        data = self.coverage.get_data()
+
+        if self.unsynchronized_lines:
+            data.add_lines(self.unsynchronized_lines)
+            self.unsynchronized_lines = defaultdict(set)
+
+        return data
+
+    def erase(self):
+        self.coverage.erase()
+        self.unsynchronized_lines = defaultdict(set)
+        self.new_lines = defaultdict(set)
+
+        # Enables all lines again that were disabled after their first hit
+        if self.registered:
+            sys.monitoring.restart_events()
+
+    def analysis2(self, morf):
+        return self.coverage.analysis2(morf)
+
+    def report(self, **kwargs) -> float:
+        self.get_data()
+        return self.coverage.report(**kwargs)
+
+    def html_report(self, **kwargs) -> float:
+        self.get_data()
+        return self.coverage.html_report(**kwargs)
+
+
+def create_coverage_measurer(config_file: str, use_sys_monitoring: bool = False):
+    if use_sys_monitoring:
+        if sys.version_info >= (3, 12):
+            return SysMonitoringCoverage(config_file)
+
+        logging.info("sys.monitoring requires Python 3.12 or newer, falling back to coverage.py")
+
+    return Coverage(data_file=None, config_file=config_file)
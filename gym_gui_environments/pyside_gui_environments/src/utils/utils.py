@@ -1,8 +1,10 @@
+from typing import Dict, Optional
+
 import numpy as np
-from PySide6.QtCore import QFile, QObject, Signal
-from PySide6.QtGui import QImage
+from PySide6.QtCore import QBuffer, QByteArray, QFile, QObject, Signal
+from PySide6.QtGui import QImage, QPainter
 from PySide6.QtUiTools import QUiLoader
-from PySide6.QtWidgets import QWidget, QApplication
+from PySide6.QtWidgets import QApplication, QMainWindow, QWidget
 
 
 class SignalHandler(QObject):
@@ -15,32 +17,110 @@ class SignalHandler(QObject):
     changed_active_car_configurator_widgets = Signal(object)  # Type Hint of signal values: List[QWidget]
 
 
+# Contents of the .ui files that have been read in advance with preload_ui_file(), by file path
+preloaded_ui_files: Dict[str, bytes] = {}
+
+
+def preload_ui_file(ui_file: str):
+    with open(ui_file, "rb") as f:
+        preloaded_ui_files[ui_file] = f.read()
+
+
 def load_ui(ui_file: str, parent_widget: QWidget = None) -> QWidget:
     loader = QUiLoader()
-    ui_file = QFile(ui_file)
-    ui_file.open(QFile.ReadOnly)
-    loaded_widget = loader.load(ui_file, parent_widget)
-    ui_file.close()
+
+    if ui_file in preloaded_ui_files:
+        ui_device = QBuffer()
+        ui_device.setData(QByteArray(preloaded_ui_files[ui_file]))
+    else:
+        ui_device = QFile(ui_file)
+
+    ui_device.open(QFile.ReadOnly)
+    loaded_widget = loader.load(ui_device, parent_widget)
+    ui_device.close()
 
     return loaded_widget
 
 
-def convert_qimage_to_ndarray(image: QImage):
+def get_image_view(image: QImage, channels: int) -> np.ndarray:
+    # Array of shape (height, width, channels) that shares the memory of an image with one byte per channel, e.g. 4 for
+    # Format_RGB32 (channels in BGRA order), 3 for Format_BGR888 or 1 for Format_Grayscale8. Only valid as long as the
+    # image exists and is not modified.
     width = image.width()
     height = image.height()
 
-    data = image.constBits()
+    data = np.frombuffer(image.constBits(), dtype=np.uint8, count=image.sizeInBytes())
+
+    # Lines can be padded
+    return data.reshape((height, image.bytesPerLine()))[:, :width * channels].reshape((height, width, channels))
+
 
-    # Discard Alpha channel at the end
-    array = np.array(data).reshape((height, width, 4))[:, :, :3]
-    return array
+def convert_qimage_to_ndarray(image: QImage, out: np.ndarray = None) -> np.ndarray:
+    """
+    Converts the image into a contiguous array of shape (height, width, 3) with the channels in BGR order. If out is
+    given, the image is converted into it instead of a newly allocated array.
+    """
+    if out is None:
+        out = np.empty((image.height(), image.width(), 3), dtype=np.uint8)
 
+    # Qt converts the pixels while drawing the image into the array, which is much faster than slicing off the alpha
+    # channel with numpy
+    target = QImage(out.data, out.shape[1], out.shape[0], out.strides[0], QImage.Format_BGR888)
+    painter = QPainter(target)
+    painter.setCompositionMode(QPainter.CompositionMode_Source)
+    painter.drawImage(0, 0, image)
+    painter.end()
 
-def take_screenshot(window_id) -> np.ndarray:
+    return out
+
+
+def take_screenshot(window_id, out: np.ndarray = None) -> np.ndarray:
     screen = QApplication.primaryScreen()
     screenshot = screen.grabWindow(window_id, 0, 0).toImage()
 
-    return convert_qimage_to_ndarray(screenshot)
+    return convert_qimage_to_ndarray(screenshot, out)
+
+
+def get_number_of_parent_windows(window: QWidget) -> int:
+    number_of_parent_windows = 0
+
+    while window.parentWidget() is not None:
+        window = window.parentWidget().window()
+        number_of_parent_windows += 1
+
+    return number_of_parent_windows
+
+
+def belongs_to_window(main_window: QWidget, widget: QWidget) -> bool:
+    """
+    Returns True if the widget is part of the main window, i.e. a child, a dialog or a popup of it. Several main windows
+    can share an application, widgets without a main window as their root (e.g. the temporary widgets of a combo box
+    animation) belong to all of them.
+    """
+    while widget.parentWidget() is not None:
+        widget = widget.parentWidget()
+
+    return widget is main_window or not isinstance(widget, QMainWindow)
+
+
+def get_active_modal_widget(main_window: QWidget) -> Optional[QWidget]:
+    """
+    Returns the active modal widget of the main window, which equals QApplication.activeModalWidget() if the application
+    has only one main window. Otherwise, the modal dialogs of the other main windows are ignored, and of the visible
+    modal dialogs of this main window the one with the most parent windows is returned, i.e. the one that was opened
+    last.
+    """
+    active_modal_widget = QApplication.activeModalWidget()
+
+    if active_modal_widget is None or belongs_to_window(main_window, active_modal_widget):
+        return active_modal_widget
+
+    modal_widgets = [
+        widget for widget in QApplication.topLevelWidgets()
+        if widget.isVisible() and widget.isModal() and belongs_to_window(main_window, widget)
+    ]
+
+    return max(modal_widgets, key=get_number_of_parent_windows, default=None)
 
 
 def do_nothing_function():
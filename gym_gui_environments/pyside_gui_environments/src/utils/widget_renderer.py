@@ -0,0 +1,89 @@
+from typing import List
+
+import numpy as np
+from PySide6.QtCore import QObject, QPoint, Qt, Slot
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtWidgets import QApplication, QWidget
+
+from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
+from gym_gui_environments.pyside_gui_environments.src.utils.settle_detector import ANIMATION_EFFECT_WIDGETS
+from gym_gui_environments.pyside_gui_environments.src.utils.utils import (belongs_to_window, convert_qimage_to_ndarray,
+                                                                         get_active_modal_widget,
+                                                                         get_number_of_parent_windows)
+
+
+def get_visible_windows(main_window: QWidget) -> List[QWidget]:
+    """
+    Returns the visible top-level windows from bottom to top: the main window, the other windows (e.g. dialogs) and
+    last the popups (e.g. opened combo boxes). Dialogs are above their parent windows, and the active modal dialog is
+    above all other dialogs. Windows of other main windows in the same application are left out.
+    """
+    main_window = main_window.window()
+
+    windows = []
+    popups = []
+
+    for widget in QApplication.topLevelWidgets():
+        if widget is main_window or not widget.isVisible() or not belongs_to_window(main_window, widget):
+            continue
+
+        if widget.metaObject().className() in ANIMATION_EFFECT_WIDGETS:
+            # Temporary copy of a popup during its animation, the popup itself is used instead
+            continue
+
+        if widget.windowType() == Qt.Popup:
+            popups.append(widget)
+        else:
+            windows.append(widget)
+
+    active_modal_widget = get_active_modal_widget(main_window)
+    windows.sort(key=lambda window: (window is active_modal_widget, get_number_of_parent_windows(window)))
+
+    return [main_window] + windows + popups
+
+
+class WidgetRenderer(QObject):
+    """
+    Creates the observation by rendering the widget tree with QWidget.render() instead of grabbing the window from the
+    screen. This does not need a display or window system, so it also works with QT_QPA_PLATFORM=offscreen.
+
+    The main window is rendered first, then the other visible top-level windows (dialogs, and last the popups like
+    opened combo boxes) at their position relative to the main window. All of them are drawn into the same QImage, and
+    the frame is converted into the same array every time, so rendering does not allocate any memory. The returned
+    frame is overwritten by the next call.
+
+    Must be used in the GUI thread, the click thread calls render() through a blocking queued connection.
+    """
+
+    def __init__(self, main_window: QWidget, paint_event_filter: PaintEventFilter, **kwargs):
+        super().__init__(**kwargs)
+        self.main_window = main_window
+        self.paint_event_filter = paint_event_filter
+
+        size = main_window.window().size()
+
+        # Same format as the screenshots taken with grabWindow(). Rendering directly into a 24 bit format would save the
+        # copy into the frame, but antialiased edges are then blended slightly differently.
+        self.image = QImage(size.width(), size.height(), QImage.Format_RGB32)
+
+        # Result of the last render() call
+        self.frame = np.zeros((size.height(), size.width(), 3), dtype=np.uint8)
+
+    @Slot()
+    def render(self) -> np.ndarray:
+        main_window = self.main_window.window()
+        origin = main_window.mapToGlobal(QPoint(0, 0))
+
+        self.image.fill(Qt.black)
+
+        # Rendering sends paint events, which must not count as activity of the application
+        self.paint_event_filter.paused = True
+
+        painter = QPainter(self.image)
+        for window in get_visible_windows(self.main_window):
+            window.render(painter, window.mapToGlobal(QPoint(0, 0)) - origin)
+        painter.end()
+
+        self.paint_event_filter.paused = False
+
+        return convert_qimage_to_ndarray(self.image, self.frame)
@@ -0,0 +1,21 @@
+import importlib.resources
+import os
+
+import pytest
+
+# The GUI tests do not need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication()
+    yield app
+
+
+@pytest.fixture(scope="session")
+def coveragerc_file_path() -> str:
+    with importlib.resources.path("gym_gui_environments.pyside_gui_environments", ".coveragerc") as resource:
+        return resource.__str__()
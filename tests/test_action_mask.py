@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from gym_gui_environments.pyside_gui_environments.src.utils.action_mask import (create_action_mask,
+                                                                               get_grid_cell_centers)
+
+WINDOW_SIZE = (448, 448)
+
+BOXES = np.array([
+    (10, 20, 100, 30),
+    # Partly outside the window
+    (400, 430, 100, 100),
+    # Completely outside the window
+    (500, 10, 20, 20),
+    (-50, -50, 20, 20),
+], dtype=np.int32)
+
+
+def test_boxes_are_clipped_to_the_window():
+    boxes = create_action_mask(BOXES, "boxes", WINDOW_SIZE)
+
+    np.testing.assert_array_equal(boxes, [(10, 20, 100, 30), (400, 430, 48, 18)])
+    assert boxes.dtype == np.int32
+
+
+def test_no_boxes():
+    empty_boxes = np.zeros((0, 4), dtype=np.int32)
+
+    assert create_action_mask(empty_boxes, "boxes", WINDOW_SIZE).shape == (0, 4)
+    assert not create_action_mask(empty_boxes, "grid", WINDOW_SIZE, (8, 8)).any()
+    assert not create_action_mask(empty_boxes, "pixels", WINDOW_SIZE).any()
+
+
+def test_grid_cell_centers():
+    x, y = get_grid_cell_centers(WINDOW_SIZE, (4, 8))
+
+    np.testing.assert_array_equal(x, [28, 84, 140, 196, 252, 308, 364, 420])
+    np.testing.assert_array_equal(y, [56, 168, 280, 392])
+
+
+def test_grid_mask_contains_the_cells_whose_center_lies_in_a_box():
+    grid_shape = (8, 8)
+    mask = create_action_mask(BOXES, "grid", WINDOW_SIZE, grid_shape)
+
+    # Cells are 56 pixels wide and high, the centers are at 28, 84, ...
+    expected = np.zeros(grid_shape, dtype=bool)
+    expected[0, :2] = True
+    assert mask.shape == grid_shape
+    np.testing.assert_array_equal(mask, expected)
+
+    boxes = np.array([(0, 60, 448, 30), (390, 390, 58, 58)], dtype=np.int32)
+    mask = create_action_mask(boxes, "grid", WINDOW_SIZE, grid_shape)
+
+    expected = np.zeros(grid_shape, dtype=bool)
+    expected[1, :] = True
+    expected[7, 7] = True
+    np.testing.assert_array_equal(mask, expected)
+
+
+def test_grid_mask_of_a_non_square_grid():
+    boxes = np.array([(0, 0, 100, 448)], dtype=np.int32)
+    mask = create_action_mask(boxes, "grid", WINDOW_SIZE, (2, 4))
+
+    np.testing.assert_array_equal(mask, [[True, False, False, False], [True, False, False, False]])
+
+
+def test_pixel_mask():
+    mask = create_action_mask(BOXES, "pixels", WINDOW_SIZE)
+
+    expected = np.zeros((WINDOW_SIZE[1], WINDOW_SIZE[0]), dtype=bool)
+    expected[20:50, 10:110] = True
+    expected[430:448, 400:448] = True
+    np.testing.assert_array_equal(mask, expected)
+
+
+def test_unknown_action_mask_type():
+    with pytest.raises(ValueError):
+        create_action_mask(BOXES, "circles", WINDOW_SIZE)
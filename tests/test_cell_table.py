@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from PySide6.QtCore import QPoint
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+from gym_gui_environments.pyside_gui_environments.src.main_window import MainWindow
+from gym_gui_environments.pyside_gui_environments.src.utils.cell_table import CellTable
+from gym_gui_environments.pyside_gui_environments.src.utils.hit_map import HitMap
+from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
+from gym_gui_environments.pyside_gui_environments.src.utils.sys_monitoring_coverage import create_coverage_measurer
+from gym_gui_environments.pyside_gui_environments.window_configuration import WINDOW_SIZE
+
+ANIMATION_WAIT = 400
+
+
+@pytest.mark.parametrize("grid_shape", [(8, 8), (16, 16)])
+def test_every_item_of_an_opened_combobox_stays_selectable(qapp, coveragerc_file_path, grid_shape):
+    main_window = MainWindow(create_coverage_measurer(coveragerc_file_path), PaintEventFilter())
+    hit_map = HitMap(main_window)
+    qapp.installEventFilter(hit_map)
+    main_window.show()
+    QTest.qWaitForWindowExposed(main_window)
+
+    try:
+        main_window.execute_mouse_click(main_window.main_window.calculator_button, QPoint(5, 5))
+        combobox = main_window.main_window.first_operand_combobox
+        main_window.execute_mouse_click(combobox, QPoint(5, 5))
+        QTest.qWait(ANIMATION_WAIT)
+
+        view = combobox.view()
+        assert view.isVisible()
+
+        cell_table = CellTable(hit_map, WINDOW_SIZE, grid_shape)
+        cell_table.update()
+
+        # Items of the combo box below the cell centers
+        origin = main_window.mapToGlobal(QPoint(0, 0))
+        cell_items = []
+        for x, y in zip(cell_table.cell_x, cell_table.cell_y):
+            widget, local_position = hit_map.widget_at(x, y)
+            index = view.indexAt(local_position) if widget is view.viewport() else None
+            cell_items.append(index.row() if index is not None and index.isValid() else None)
+
+            assert widget is QApplication.widgetAt(origin + QPoint(int(x), int(y)))
+
+        items = {item for item in cell_items if item is not None}
+        representative_items = [item for item, representative in zip(cell_items, cell_table.representative_cells)
+                                if representative and item is not None]
+
+        assert len(items) > 1
+        assert sorted(representative_items) == sorted(items)
+    finally:
+        for widget in QApplication.topLevelWidgets():
+            widget.hide()
+        qapp.removeEventFilter(hit_map)
+        main_window.deleteLater()
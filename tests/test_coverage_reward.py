@@ -0,0 +1,46 @@
+import io
+import sys
+
+import numpy as np
+import pytest
+from PySide6.QtTest import QTest
+
+from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
+from gym_gui_environments.pyside_gui_environments.src.utils.sys_monitoring_coverage import create_coverage_measurer
+from gym_gui_environments.pyside_gui_environments.window_configuration import WINDOW_SIZE
+
+NUMBER_OF_CLICKS = 200
+
+
+@pytest.mark.parametrize("use_sys_monitoring", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(sys.version_info < (3, 12), reason="sys.monitoring needs Python 3.12"))
+])
+def test_coverage_percentage_equals_report(qapp, coveragerc_file_path, use_sys_monitoring):
+    coverage_measurer = create_coverage_measurer(coveragerc_file_path, use_sys_monitoring)
+
+    coverage_measurer.start()
+    from gym_gui_environments.pyside_gui_environments.src.main_window import MainWindow
+    coverage_measurer.stop()
+
+    main_window = MainWindow(coverage_measurer, PaintEventFilter(), random_seed=0)
+    main_window.show()
+    QTest.qWaitForWindowExposed(main_window)
+
+    random_state = np.random.RandomState(0)
+
+    try:
+        for i in range(NUMBER_OF_CLICKS):
+            # Random widgets open the dialogs and combo boxes, random coordinates also hit everything else
+            if i % 2 == 0:
+                main_window.simulate_click_on_random_widget()
+            else:
+                main_window.simulate_click(random_state.randint(0, WINDOW_SIZE[0]),
+                                           random_state.randint(0, WINDOW_SIZE[1]))
+            QTest.qWait(5)
+
+            expected_percentage = coverage_measurer.report(file=io.StringIO())
+            assert main_window.get_current_coverage_percentage() == expected_percentage, f"Click {i}"
+    finally:
+        main_window.close()
+        main_window.deleteLater()
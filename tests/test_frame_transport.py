@@ -0,0 +1,108 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from gym_gui_environments.pyside_gui_environments.src.utils.frame_transport import (DELTA_FULL_FRAME, DELTA_TILES,
+                                                                                    DeltaFrameTransport,
+                                                                                    create_frame_transport)
+
+
+def _join(message: List) -> memoryview:
+    # As the channel sends the parts of a message in one frame
+    return memoryview(b"".join(bytes(memoryview(part).cast("B")) for part in message))
+
+
+def _change_tile(frame: np.ndarray, y: int, x: int, size: int = 3):
+    frame[y:y + size, x:x + size] = 255 - frame[y:y + size, x:x + size]
+
+
+@pytest.mark.parametrize("frame_shape, dtype", [
+    ((448, 448, 3), np.uint8),
+    # Not a multiple of the tile size, the tiles at the border are smaller
+    ((100, 70, 1), np.uint8),
+    ((84, 84, 4), np.float16),
+])
+def test_delta_round_trip(frame_shape, dtype):
+    random_state = np.random.RandomState(0)
+    frame = (random_state.rand(*frame_shape) * 255).astype(dtype)
+
+    # The encoder lives in the application process, the decoder in the environment process
+    encoder = DeltaFrameTransport(frame_shape, dtype=dtype)
+    decoder = DeltaFrameTransport(frame_shape, dtype=dtype)
+
+    message = encoder.encode(frame)
+    assert message[0] == DELTA_FULL_FRAME
+    np.testing.assert_array_equal(decoder.decode(_join(message)), frame)
+
+    # Unchanged frames are sent as an empty message
+    message = encoder.encode(frame)
+    assert message == []
+    np.testing.assert_array_equal(decoder.decode(_join(message)), frame)
+
+    # Only the changed tiles are sent, including the ones at the right and bottom border
+    frame = frame.copy()
+    _change_tile(frame, 0, 0)
+    _change_tile(frame, 20, 36)
+    _change_tile(frame, frame_shape[0] - 2, frame_shape[1] - 2, size=2)
+
+    message = encoder.encode(frame)
+    assert message[0] == DELTA_TILES
+    assert (len(message) - 1) // 2 == 3
+    np.testing.assert_array_equal(decoder.decode(_join(message)), frame)
+
+    # If most of the frame has changed, the whole frame is sent again
+    frame = (random_state.rand(*frame_shape) * 255).astype(dtype)
+
+    message = encoder.encode(frame)
+    assert message[0] == DELTA_FULL_FRAME
+    np.testing.assert_array_equal(decoder.decode(_join(message)), frame)
+
+
+def test_delta_encoder_does_not_keep_a_reference_to_the_frame():
+    # The screenshot buffer of the application process is reused for every frame
+    frame_shape = (64, 64, 3)
+    frame = np.zeros(frame_shape, dtype=np.uint8)
+
+    encoder = DeltaFrameTransport(frame_shape)
+    decoder = DeltaFrameTransport(frame_shape)
+
+    decoder.decode(_join(encoder.encode(frame)))
+    _change_tile(frame, 40, 40)
+
+    np.testing.assert_array_equal(decoder.decode(_join(encoder.encode(frame))), frame)
+
+
+def test_delta_decode_copy():
+    frame_shape = (32, 32, 3)
+    frame = np.zeros(frame_shape, dtype=np.uint8)
+
+    encoder = DeltaFrameTransport(frame_shape)
+    decoder = DeltaFrameTransport(frame_shape, copy=False)
+
+    first_observation = decoder.decode(_join(encoder.encode(frame)))
+    _change_tile(frame, 0, 0)
+    second_observation = decoder.decode(_join(encoder.encode(frame)))
+
+    # Without copies, the observation is the reconstructed frame itself and is updated in place
+    assert first_observation is second_observation
+    np.testing.assert_array_equal(first_observation, frame)
+
+
+@pytest.mark.parametrize("observation_transport", ["pipe", "shared_memory", "delta"])
+def test_round_trip_of_all_transports(observation_transport):
+    frame_shape = (84, 84, 3)
+    random_state = np.random.RandomState(0)
+
+    transport = create_frame_transport(observation_transport, frame_shape)
+    try:
+        for _ in range(6):
+            frame = random_state.randint(0, 256, frame_shape, dtype=np.uint8)
+            np.testing.assert_array_equal(transport.decode(_join(transport.encode(frame))), frame)
+    finally:
+        transport.close()
+
+
+def test_unknown_transport():
+    with pytest.raises(ValueError):
+        create_frame_transport("carrier_pigeon", (84, 84, 3))
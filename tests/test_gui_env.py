@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from gym_gui_environments.pyside_gui_environments import GUIEnvRandomClick, GUIEnvRandomWidget
+
+
+@pytest.mark.parametrize("env_class", [GUIEnvRandomClick, GUIEnvRandomWidget])
+def test_random_clickers_step_without_action(env_class):
+    env = env_class()
+    try:
+        env.reset()
+
+        for _ in range(3):
+            observation, _, done, info = env.step()
+
+            assert observation.shape == env.observation_space.shape
+            assert not done
+            assert "x" in info and "y" in info
+    finally:
+        env.close()
+
+
+def test_html_reports_of_consecutive_episodes_get_own_directories(tmp_path):
+    env = GUIEnvRandomWidget(generate_html_report=True, html_report_directory=str(tmp_path))
+    try:
+        for _ in range(2):
+            env.reset()
+            for _ in range(3):
+                env.step()
+    finally:
+        env.close()
+
+    # The report of the first episode is requested by the second reset(), the one of the second episode by close()
+    directories = env.wait_for_html_reports(timeout=120)
+
+    assert len(directories) == 2
+    assert len(set(directories)) == 2
+    for directory in directories:
+        assert os.path.dirname(directory) == str(tmp_path)
+        assert os.path.isfile(os.path.join(directory, "index.html"))
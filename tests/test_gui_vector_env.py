@@ -0,0 +1,25 @@
+from gym_gui_environments.pyside_gui_environments import GUIEnvRandomClick, GUIVectorEnv
+
+
+def _run_seeded(seed: int, steps: int) -> list:
+    vector_env = GUIVectorEnv(2, GUIEnvRandomClick)
+    try:
+        vector_env.seed(seed)
+        vector_env.reset()
+
+        clicks = []
+        for _ in range(steps):
+            _, _, _, infos = vector_env.step()
+            clicks.append([(info["x"], info["y"]) for info in infos])
+
+        return clicks
+    finally:
+        vector_env.close()
+
+
+def test_seed_then_reset():
+    clicks = _run_seeded(3, steps=3)
+
+    # Each environment gets its own seed, and the same seed repeats the same clicks
+    assert [click for click, _ in clicks] != [click for _, click in clicks]
+    assert _run_seeded(3, steps=3) == clicks
@@ -0,0 +1,75 @@
+import numpy as np
+from PySide6.QtCore import QPoint, Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+from gym_gui_environments.pyside_gui_environments.src.main_window import MainWindow
+from gym_gui_environments.pyside_gui_environments.src.utils.hit_map import HitMap
+from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
+from gym_gui_environments.pyside_gui_environments.src.utils.settle_detector import SettleDetector
+from gym_gui_environments.pyside_gui_environments.src.utils.sys_monitoring_coverage import create_coverage_measurer
+from gym_gui_environments.pyside_gui_environments.src.utils.utils import get_active_modal_widget
+from gym_gui_environments.pyside_gui_environments.src.utils.widget_renderer import get_visible_windows
+
+NUMBER_OF_CLICKS = 150
+POINTS_PER_CLICK = 200
+SETTLE_TIMEOUT = 1000
+
+
+def _wait_until_settled(settle_detector: SettleDetector):
+    settle_detector.settled.clear()
+    settle_detector.start(SETTLE_TIMEOUT)
+
+    while not settle_detector.settled.is_set():
+        QTest.qWait(5)
+
+
+def test_hit_map_finds_the_same_widgets_as_widget_at(qapp, coveragerc_file_path):
+    paint_event_filter = PaintEventFilter()
+    qapp.installEventFilter(paint_event_filter)
+
+    main_window = MainWindow(create_coverage_measurer(coveragerc_file_path), paint_event_filter, random_seed=0)
+    hit_map = HitMap(main_window)
+    qapp.installEventFilter(hit_map)
+    main_window.show()
+    QTest.qWaitForWindowExposed(main_window)
+
+    settle_detector = SettleDetector(paint_event_filter)
+    random_state = np.random.RandomState(0)
+    height, width = hit_map.widget_ids.shape
+
+    seen_states = set()
+
+    try:
+        for i in range(NUMBER_OF_CLICKS):
+            main_window.simulate_click_on_random_widget()
+            _wait_until_settled(settle_detector)
+
+            visible_windows = get_visible_windows(main_window)
+            if any(window.windowType() == Qt.Popup for window in visible_windows):
+                seen_states.add("popup")
+            if get_active_modal_widget(main_window) is not None:
+                seen_states.add("modal_dialog")
+            if main_window.settings_dialog.isVisible():
+                seen_states.add("settings_dialog")
+
+            origin = main_window.mapToGlobal(QPoint(0, 0))
+
+            for x, y in zip(random_state.randint(0, width, POINTS_PER_CLICK),
+                            random_state.randint(0, height, POINTS_PER_CLICK)):
+                widget, local_position = hit_map.widget_at(x, y)
+                expected_widget = QApplication.widgetAt(origin + QPoint(x, y))
+
+                assert widget is expected_widget, f"Click {i}, point ({x}, {y}), visible windows {visible_windows}"
+                if widget is not None:
+                    assert widget.mapToGlobal(local_position) == origin + QPoint(x, y)
+    finally:
+        for widget in QApplication.topLevelWidgets():
+            widget.hide()
+        qapp.removeEventFilter(hit_map)
+        qapp.removeEventFilter(paint_event_filter)
+        main_window.deleteLater()
+
+    # The points have to be sampled with opened combo boxes, the settings dialog of the menu bar and the other modal
+    # dialogs
+    assert seen_states == {"popup", "modal_dialog", "settings_dialog"}
@@ -0,0 +1,52 @@
+from PySide6.QtCore import QPoint
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+from gym_gui_environments.pyside_gui_environments.src.main_window import MainWindow
+from gym_gui_environments.pyside_gui_environments.src.utils.hit_map import HitMap
+from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
+from gym_gui_environments.pyside_gui_environments.src.utils.sys_monitoring_coverage import create_coverage_measurer
+from gym_gui_environments.pyside_gui_environments.src.utils.utils import get_active_modal_widget
+
+ANIMATION_WAIT = 400
+
+
+def test_combobox_closed_by_dialog_of_other_main_window(qapp, coveragerc_file_path):
+    main_windows = []
+    for _ in range(2):
+        main_window = MainWindow(create_coverage_measurer(coveragerc_file_path), PaintEventFilter())
+        main_window.hit_map = HitMap(main_window)
+        qapp.installEventFilter(main_window.hit_map)
+        main_window.show()
+        main_windows.append(main_window)
+
+    first_main_window, second_main_window = main_windows
+    QTest.qWaitForWindowExposed(second_main_window)
+
+    try:
+        second_main_window.execute_mouse_click(second_main_window.main_window.calculator_button, QPoint(5, 5))
+        combobox = second_main_window.main_window.first_operand_combobox
+        second_main_window.execute_mouse_click(combobox, QPoint(5, 5))
+        QTest.qWait(ANIMATION_WAIT)
+
+        assert second_main_window.open_combobox is combobox
+        assert combobox.view().isVisible()
+
+        # Opening the settings dialog of the first main window closes all popups of the application
+        first_main_window.execute_mouse_click(first_main_window.settings_action, QPoint(0, 0))
+        QTest.qWait(ANIMATION_WAIT)
+
+        assert get_active_modal_widget(first_main_window) is first_main_window.settings_dialog
+        assert get_active_modal_widget(second_main_window) is None
+        assert not combobox.view().isVisible()
+        assert second_main_window.open_combobox is None
+
+        # The next click of the second main window is a regular click, not one that closes the combo box
+        _, increased_delay = second_main_window.simulate_click(200, 300)
+        assert not increased_delay
+    finally:
+        for widget in QApplication.topLevelWidgets():
+            widget.hide()
+        for main_window in main_windows:
+            qapp.removeEventFilter(main_window.hit_map)
+            main_window.deleteLater()
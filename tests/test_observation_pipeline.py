@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from gym_gui_environments.pyside_gui_environments.src.utils.observation_pipeline import ObservationPipeline
+
+INPUT_SHAPE = (448, 448, 3)
+
+
+def _random_screenshot(random_state: np.random.RandomState) -> np.ndarray:
+    return random_state.randint(0, 256, INPUT_SHAPE, dtype=np.uint8)
+
+
+@pytest.mark.parametrize("kwargs, shape, dtype", [
+    ({}, (448, 448, 3), np.uint8),
+    ({"crop": (10, 20, 100, 200)}, (100, 200, 3), np.uint8),
+    ({"resize": (84, 84)}, (84, 84, 3), np.uint8),
+    ({"resize": (84, 84), "grayscale": True}, (84, 84, 1), np.uint8),
+    ({"crop": (0, 0, 224, 448), "resize": (64, 128), "dtype": "float16"}, (64, 128, 3), np.float16),
+    ({"resize": (84, 84), "grayscale": True, "frame_stack": 4}, (84, 84, 4), np.uint8),
+    ({"dtype": "float16", "frame_stack": 2}, (448, 448, 6), np.float16),
+])
+def test_output_shape_and_dtype(kwargs, shape, dtype):
+    pipeline = ObservationPipeline(INPUT_SHAPE, **kwargs)
+    observation = pipeline.process(_random_screenshot(np.random.RandomState(0)), first_frame=True)
+
+    assert observation.shape == shape
+    assert observation.dtype == dtype
+    assert pipeline.observation_space.shape == shape
+    assert pipeline.observation_space.dtype == dtype
+    assert pipeline.observation_space.contains(observation)
+
+
+def test_crop():
+    screenshot = _random_screenshot(np.random.RandomState(0))
+    pipeline = ObservationPipeline(INPUT_SHAPE, crop=(10, 20, 100, 200))
+
+    np.testing.assert_array_equal(pipeline.process(screenshot), screenshot[10:110, 20:220])
+
+
+def test_grayscale_uses_qgray_weights():
+    screenshot = np.zeros(INPUT_SHAPE, dtype=np.uint8)
+    # BGR
+    screenshot[...] = (40, 120, 200)
+    pipeline = ObservationPipeline(INPUT_SHAPE, grayscale=True)
+
+    expected = (200 * 11 + 120 * 16 + 40 * 5) // 32
+    np.testing.assert_array_equal(pipeline.process(screenshot), expected)
+
+
+def test_float16_is_scaled_to_unit_interval():
+    screenshot = _random_screenshot(np.random.RandomState(0))
+    pipeline = ObservationPipeline(INPUT_SHAPE, dtype="float16")
+
+    np.testing.assert_array_equal(pipeline.process(screenshot), (screenshot / 255).astype(np.float16))
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"resize": (84, 84)},
+    {"crop": (10, 20, 100, 200), "grayscale": True},
+])
+def test_transformed_frames_are_deterministic(kwargs):
+    # The transformed frame must not be read after the QImage it was converted into has been freed
+    screenshot = _random_screenshot(np.random.RandomState(0))
+    pipeline = ObservationPipeline(INPUT_SHAPE, **kwargs)
+
+    first_observation = pipeline.process(screenshot).copy()
+    _random_screenshot(np.random.RandomState(1))
+
+    np.testing.assert_array_equal(pipeline.process(screenshot), first_observation)
+
+
+def test_frame_stack():
+    random_state = np.random.RandomState(0)
+    screenshots = [_random_screenshot(random_state) for _ in range(5)]
+    pipeline = ObservationPipeline(INPUT_SHAPE, frame_stack=3)
+
+    # The stack is filled with the first frame
+    observation = pipeline.process(screenshots[0], first_frame=True)
+    np.testing.assert_array_equal(observation, np.concatenate([screenshots[0]] * 3, axis=2))
+
+    # The oldest frame comes first
+    pipeline.process(screenshots[1])
+    observation = pipeline.process(screenshots[2])
+    np.testing.assert_array_equal(observation, np.concatenate(screenshots[:3], axis=2))
+
+    observation = pipeline.process(screenshots[3])
+    np.testing.assert_array_equal(observation, np.concatenate(screenshots[1:4], axis=2))
+
+    # A new episode removes the frames of the previous one
+    observation = pipeline.process(screenshots[4], first_frame=True)
+    np.testing.assert_array_equal(observation, np.concatenate([screenshots[4]] * 3, axis=2))
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"dtype": "float32"},
+    {"frame_stack": 0},
+    {"crop": (400, 0, 100, 100)},
+    {"crop": (0, 0, 0, 100)},
+])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        ObservationPipeline(INPUT_SHAPE, **kwargs)
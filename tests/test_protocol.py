@@ -0,0 +1,128 @@
+import threading
+from multiprocessing import Pipe
+
+import numpy as np
+import pytest
+
+from gym_gui_environments.pyside_gui_environments.src.utils.protocol import (INITIAL_BUFFER_SIZE, NO_CLICK_RESULT,
+                                                                            REQUEST_RESET, REQUEST_STEP,
+                                                                            REQUEST_TERMINATE, RESPONSE_OBSERVATION,
+                                                                            RESPONSE_STEP, RESPONSE_TERMINATED, Channel)
+
+
+@pytest.fixture
+def channels():
+    environment_connection, application_connection = Pipe(duplex=True)
+    environment_channel, application_channel = Channel(environment_connection), Channel(application_connection)
+
+    yield environment_channel, application_channel
+
+    environment_connection.close()
+    application_connection.close()
+
+
+def _send_in_thread(send, *args, **kwargs) -> threading.Thread:
+    # Messages that are larger than the buffer of the pipe are only sent completely while they are received
+    thread = threading.Thread(target=send, args=args, kwargs=kwargs)
+    thread.start()
+    return thread
+
+
+@pytest.mark.parametrize("action", [
+    (12, 345),
+    (0, 0),
+    # Click on a random widget
+    True,
+    # Macro actions
+    [(1, 2), True, (447, 447)],
+    [True],
+])
+def test_step_request_round_trip(channels, action):
+    environment_channel, application_channel = channels
+
+    environment_channel.send_step(action)
+
+    assert application_channel.receive_request() == (REQUEST_STEP, action)
+
+
+def test_coordinates_are_sent_as_integers(channels):
+    environment_channel, application_channel = channels
+
+    environment_channel.send_step((np.int64(3), np.int32(4)))
+
+    request_type, action = application_channel.receive_request()
+    assert action == (3, 4)
+    assert all(type(coordinate) is int for coordinate in action)
+
+
+def test_reset_and_terminate_requests(channels):
+    environment_channel, application_channel = channels
+
+    environment_channel.send_reset()
+    environment_channel.send_terminate()
+
+    assert application_channel.receive_request()[0] == REQUEST_RESET
+    assert application_channel.receive_request()[0] == REQUEST_TERMINATE
+
+
+def test_response_round_trip(channels):
+    environment_channel, application_channel = channels
+    observation = np.arange(448 * 3, dtype=np.uint8).reshape((1, 448, 3))
+    extras = {"action_mask": np.ones((8, 8), dtype=bool), "click_results": [(0.5, 1, 2, False)]}
+
+    # The payload is sent in parts, which are joined in the send buffer
+    application_channel.send_response(RESPONSE_STEP, (0.25, 10, 20, True), extras, [b"\x01", observation])
+
+    response = environment_channel.receive_response()
+    assert response.response_type == RESPONSE_STEP
+    assert (response.reward, response.x, response.y, response.increased_delay) == (0.25, 10, 20, True)
+    np.testing.assert_array_equal(response.extras["action_mask"], extras["action_mask"])
+    assert response.extras["click_results"] == extras["click_results"]
+    assert bytes(response.payload) == b"\x01" + observation.tobytes()
+
+
+def test_response_without_extras_and_payload(channels):
+    environment_channel, application_channel = channels
+
+    application_channel.send_response(RESPONSE_TERMINATED)
+
+    response = environment_channel.receive_response()
+    assert response.response_type == RESPONSE_TERMINATED
+    assert (response.reward, response.x, response.y, response.increased_delay) == NO_CLICK_RESULT
+    assert response.extras == {}
+    assert bytes(response.payload) == b""
+
+
+def test_buffers_grow_for_large_messages(channels):
+    environment_channel, application_channel = channels
+    random_state = np.random.RandomState(0)
+
+    sizes = [INITIAL_BUFFER_SIZE * 10, INITIAL_BUFFER_SIZE * 10, INITIAL_BUFFER_SIZE // 2, INITIAL_BUFFER_SIZE * 20]
+
+    for size in sizes:
+        observation = random_state.randint(0, 256, size, dtype=np.uint8)
+        extras = {"intermediate_observations": [observation[:INITIAL_BUFFER_SIZE * 2]]}
+
+        # The first message of a new maximum size does not fit into the receive buffer (BufferTooShort)
+        thread = _send_in_thread(application_channel.send_response, RESPONSE_OBSERVATION, extras=extras,
+                                 payload=[observation])
+        response = environment_channel.receive_response()
+        thread.join()
+
+        assert response.response_type == RESPONSE_OBSERVATION
+        np.testing.assert_array_equal(response.extras["intermediate_observations"][0],
+                                      extras["intermediate_observations"][0])
+        assert bytes(response.payload) == observation.tobytes()
+
+    assert len(environment_channel.receive_buffer) > INITIAL_BUFFER_SIZE * 20
+    assert len(application_channel.send_buffer) > INITIAL_BUFFER_SIZE * 20
+
+
+def test_large_macro_action(channels):
+    environment_channel, application_channel = channels
+    action = [(i % 448, i // 448) for i in range(20000)]
+
+    thread = _send_in_thread(environment_channel.send_step, action)
+    assert application_channel.receive_request() == (REQUEST_STEP, action)
+    thread.join()
+
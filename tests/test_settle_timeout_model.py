@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+import pytest
+
+from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
+from gym_gui_environments.pyside_gui_environments.src.utils.settle_timeout_model import (MAX_SETTLE_BUDGET,
+                                                                                        MIN_SETTLE_BUDGET,
+                                                                                        MIN_SETTLE_SAMPLES,
+                                                                                        SETTLE_BUDGET_MARGIN,
+                                                                                        SettleTimeoutModel,
+                                                                                        add_settle_durations,
+                                                                                        load_settle_durations,
+                                                                                        save_settle_durations)
+
+CLICK_TYPE = "QComboBox/combobox_opened"
+
+
+def _create_model(durations: dict = None, **kwargs) -> SettleTimeoutModel:
+    model = SettleTimeoutModel(PaintEventFilter(), durations=durations, **kwargs)
+    model.start(*CLICK_TYPE.split("/"))
+    return model
+
+
+def test_no_budget_without_enough_samples():
+    model = SettleTimeoutModel(PaintEventFilter())
+    # No click has been started
+    assert model.get_budget() is None
+
+    model = _create_model({CLICK_TYPE: [100] * (MIN_SETTLE_SAMPLES - 1)})
+    assert model.get_budget() is None
+
+    model = _create_model({CLICK_TYPE: [100] * MIN_SETTLE_SAMPLES})
+    assert model.get_budget() == 100 + SETTLE_BUDGET_MARGIN
+
+
+@pytest.mark.parametrize("percentile", [50, 95, 100])
+def test_budget_is_percentile_plus_margin(percentile):
+    durations = list(range(10, 210, 10))
+    model = _create_model({CLICK_TYPE: durations}, percentile=percentile)
+
+    assert model.get_budget() == int(np.percentile(durations, percentile) + SETTLE_BUDGET_MARGIN)
+
+
+def test_budgets_are_clipped():
+    assert _create_model({CLICK_TYPE: [0] * MIN_SETTLE_SAMPLES}).get_budget() == MIN_SETTLE_BUDGET
+    assert _create_model({CLICK_TYPE: [5000] * MIN_SETTLE_SAMPLES}).get_budget() == MAX_SETTLE_BUDGET
+
+
+def test_budgets_are_selected_per_click_type():
+    model = _create_model({CLICK_TYPE: [300] * MIN_SETTLE_SAMPLES, "QPushButton/none": [20] * MIN_SETTLE_SAMPLES})
+    assert model.get_budget() == 300 + SETTLE_BUDGET_MARGIN
+
+    model.start("QPushButton", "none")
+    assert model.get_budget() == 20 + SETTLE_BUDGET_MARGIN
+
+    model.start("QPushButton", "modal_changed")
+    assert model.get_budget() is None
+
+    assert model.get_budgets() == {
+        CLICK_TYPE: 300 + SETTLE_BUDGET_MARGIN, "QPushButton/none": 20 + SETTLE_BUDGET_MARGIN
+    }
+
+
+def test_only_the_last_window_durations_are_used():
+    model = _create_model({CLICK_TYPE: [1000] * 20 + [100] * 10}, window=10)
+
+    assert model.get_budget() == 100 + SETTLE_BUDGET_MARGIN
+
+
+def test_finish_records_durations():
+    paint_event_filter = PaintEventFilter()
+    paint_event_filter.last_paint_event_timer.start()
+    model = SettleTimeoutModel(paint_event_filter)
+
+    # Nothing has been painted after the click
+    model.start("QPushButton", "none")
+    model.finish()
+
+    # Painted right after the click
+    model.start("QComboBox", "combobox_opened")
+    paint_event_filter.paint_event_count += 1
+    paint_event_filter.last_paint_event_timer.restart()
+    model.finish()
+
+    # A finished click is not recorded twice
+    model.finish()
+
+    assert list(model.durations["QPushButton/none"]) == [0]
+    assert len(model.durations[CLICK_TYPE]) == 1
+    assert 0 <= model.durations[CLICK_TYPE][0] < 1000
+
+
+def test_pop_new_durations_returns_only_new_measurements():
+    paint_event_filter = PaintEventFilter()
+    model = SettleTimeoutModel(paint_event_filter, durations={CLICK_TYPE: [100] * 5})
+
+    model.start("QPushButton", "none")
+    model.finish()
+
+    assert model.pop_new_durations() == {"QPushButton/none": [0]}
+    assert model.pop_new_durations() == {}
+
+    # The measurements are still used for the budgets
+    assert len(model.durations[CLICK_TYPE]) == 5
+    assert len(model.durations["QPushButton/none"]) == 1
+
+
+def test_add_settle_durations():
+    durations = {}
+    add_settle_durations(durations, {CLICK_TYPE: [1, 2, 3]}, window=4)
+    add_settle_durations(durations, {CLICK_TYPE: [4, 5], "QPushButton/none": [6]}, window=4)
+
+    assert {click_type: list(values) for click_type, values in durations.items()} == {
+        CLICK_TYPE: [2, 3, 4, 5], "QPushButton/none": [6]
+    }
+
+
+def test_save_and_load(tmp_path):
+    file_path = str(tmp_path / "settle_durations.json")
+    assert load_settle_durations(file_path) == {}
+
+    durations = {}
+    add_settle_durations(durations, {CLICK_TYPE: [1, 2, 3], "QPushButton/none": [0]})
+    save_settle_durations(file_path, durations)
+
+    # The existing file is replaced
+    add_settle_durations(durations, {CLICK_TYPE: [4]})
+    save_settle_durations(file_path, durations)
+
+    loaded_durations = load_settle_durations(file_path, window=3)
+    assert {click_type: list(values) for click_type, values in loaded_durations.items()} == {
+        CLICK_TYPE: [2, 3, 4], "QPushButton/none": [0]
+    }
+
+    # No temporary files are left behind
+    assert os.listdir(tmp_path) == ["settle_durations.json"]
@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pytest
+
+from gym_gui_environments.pyside_gui_environments.src.utils.step_timings import (HISTOGRAM_BIN_EDGES, PhaseTimer,
+                                                                                 StepTimingStatistics, measure)
+
+
+def test_phase_timer_adds_up_repeated_phases():
+    phase_timer = PhaseTimer()
+
+    phase_timer.add("mouse_click", 0.25)
+    phase_timer.add("mouse_click", 0.5)
+    with phase_timer.measure("settle_wait"):
+        pass
+
+    timings = phase_timer.pop()
+    assert timings["mouse_click"] == 0.75
+    assert timings["settle_wait"] >= 0
+
+    # pop() starts the next step
+    assert phase_timer.pop() == {}
+
+
+def test_phase_timer_measures_phases_that_raise():
+    phase_timer = PhaseTimer()
+
+    with pytest.raises(RuntimeError):
+        with phase_timer.measure("mouse_click"):
+            raise RuntimeError()
+
+    assert "mouse_click" in phase_timer.pop()
+
+
+def test_measure_without_timer_does_nothing():
+    with measure(None, "mouse_click"):
+        pass
+
+
+def test_summary():
+    statistics = StepTimingStatistics()
+    for duration in range(1, 101):
+        statistics.add({"step": duration / 1000, "send_action": 0.001})
+
+    summary = statistics.summary()
+
+    assert summary["step"]["count"] == 100
+    assert summary["step"]["mean"] == pytest.approx(0.0505)
+    assert summary["step"]["p50"] == pytest.approx(np.percentile(np.arange(1, 101) / 1000, 50))
+    assert summary["step"]["p90"] == pytest.approx(0.0901)
+    assert summary["step"]["p99"] == pytest.approx(0.09901)
+    assert summary["step"]["max"] == pytest.approx(0.1)
+    assert summary["send_action"]["p99"] == pytest.approx(0.001)
+
+
+def test_only_the_last_window_steps_are_kept():
+    statistics = StepTimingStatistics(window=10)
+    for duration in range(100):
+        statistics.add({"step": float(duration)})
+
+    summary = statistics.summary()["step"]
+    assert summary["count"] == 10
+    assert summary["max"] == 99
+    assert summary["mean"] == pytest.approx(94.5)
+
+
+def test_histograms_count_durations_outside_the_bins_in_the_outer_bins():
+    statistics = StepTimingStatistics()
+    for duration in [1e-7, 1e-3, 100.0]:
+        statistics.add({"step": duration})
+
+    histogram = statistics.histograms()["step"]
+
+    assert histogram["bin_edges"] == HISTOGRAM_BIN_EDGES.tolist()
+    assert len(histogram["counts"]) == len(HISTOGRAM_BIN_EDGES) - 1
+    assert sum(histogram["counts"]) == 3
+    assert histogram["counts"][0] == 1
+    assert histogram["counts"][-1] == 1
+
+
+def test_dump(tmp_path):
+    statistics = StepTimingStatistics()
+    statistics.add({"step": 0.01})
+
+    file_path = tmp_path / "timings.json"
+    statistics.dump(str(file_path))
+
+    with open(file_path) as f:
+        dumped = json.load(f)
+
+    assert dumped["summary"] == statistics.summary()
+    assert dumped["histograms"] == statistics.histograms()
@@ -0,0 +1,83 @@
+import numpy as np
+from PySide6.QtCore import QPoint, Qt
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+from gym_gui_environments.pyside_gui_environments.src.main_window import MainWindow
+from gym_gui_environments.pyside_gui_environments.src.utils.paint_event_filter import PaintEventFilter
+from gym_gui_environments.pyside_gui_environments.src.utils.settle_detector import SettleDetector
+from gym_gui_environments.pyside_gui_environments.src.utils.sys_monitoring_coverage import create_coverage_measurer
+from gym_gui_environments.pyside_gui_environments.src.utils.utils import get_active_modal_widget, take_screenshot
+from gym_gui_environments.pyside_gui_environments.src.utils.widget_renderer import WidgetRenderer, get_visible_windows
+
+NUMBER_OF_CLICKS = 150
+SETTLE_TIMEOUT = 1000
+
+
+def _wait_until_settled(settle_detector: SettleDetector):
+    settle_detector.settled.clear()
+    settle_detector.start(SETTLE_TIMEOUT)
+
+    while not settle_detector.settled.is_set():
+        QTest.qWait(5)
+
+
+def _grab_visible_windows(main_window: MainWindow) -> np.ndarray:
+    # grabWindow() only returns the window itself on the offscreen platform, so the screenshots of all visible windows
+    # are stacked in the same order as they are rendered
+    origin = main_window.mapToGlobal(QPoint(0, 0))
+    frame = take_screenshot(main_window.winId())
+    height, width, _ = frame.shape
+
+    for window in get_visible_windows(main_window)[1:]:
+        position = window.mapToGlobal(QPoint(0, 0)) - origin
+        screenshot = take_screenshot(window.winId())
+
+        left, top = max(position.x(), 0), max(position.y(), 0)
+        right = min(position.x() + screenshot.shape[1], width)
+        bottom = min(position.y() + screenshot.shape[0], height)
+
+        frame[top:bottom, left:right] = screenshot[top - position.y():bottom - position.y(),
+                                                   left - position.x():right - position.x()]
+
+    return frame
+
+
+def test_rendered_frames_equal_screenshots(qapp, coveragerc_file_path):
+    paint_event_filter = PaintEventFilter()
+    qapp.installEventFilter(paint_event_filter)
+
+    main_window = MainWindow(create_coverage_measurer(coveragerc_file_path), paint_event_filter, random_seed=0)
+    main_window.show()
+    QTest.qWaitForWindowExposed(main_window)
+
+    settle_detector = SettleDetector(paint_event_filter)
+    widget_renderer = WidgetRenderer(main_window, paint_event_filter)
+
+    seen_states = set()
+
+    try:
+        for i in range(NUMBER_OF_CLICKS):
+            main_window.simulate_click_on_random_widget()
+            _wait_until_settled(settle_detector)
+
+            visible_windows = get_visible_windows(main_window)
+            if any(window.windowType() == Qt.Popup for window in visible_windows):
+                seen_states.add("popup")
+            if get_active_modal_widget(main_window) is not None:
+                seen_states.add("modal_dialog")
+            if main_window.settings_dialog.isVisible():
+                seen_states.add("settings_dialog")
+
+            rendered_frame = widget_renderer.render()
+            screenshot = _grab_visible_windows(main_window)
+
+            assert np.array_equal(rendered_frame, screenshot), f"Click {i}, visible windows {visible_windows}"
+    finally:
+        for widget in QApplication.topLevelWidgets():
+            widget.hide()
+        main_window.deleteLater()
+        qapp.removeEventFilter(paint_event_filter)
+
+    # The clicks have to open combo boxes, the settings dialog of the menu bar and the other modal dialogs
+    assert seen_states == {"popup", "modal_dialog", "settings_dialog"}